@@ -423,7 +423,7 @@ DATA:
 # =====================================================
 # PROMPT INJECTION GUARD (Pure Heuristics - No ML Model)
 # =====================================================
-from prompt_injection_guard import realtime_detect, final_decision
+from prompt_injection_guard import realtime_detect, final_decision, ML_ENGINE
 
 
 # =====================================================
@@ -440,6 +440,12 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def warm_ml_model():
+    # Load and warm DeBERTa before serving, not on the first scan
+    ML_ENGINE.load()
+
+
 class ScanRequest(BaseModel):
     payload: str
 
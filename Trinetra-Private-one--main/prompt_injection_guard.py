@@ -4,57 +4,325 @@ Hybrid detection: Heuristics + ProtectAI DeBERTa ML Model
 Python 3.10+
 """
 
+import os
 import re
+import contextlib
+import itertools
+import math
+import queue
+import threading
+import time
 import unicodedata
 import base64
-from typing import Dict, List, Any, Optional
+from concurrent.futures import Future
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
 
-# ML Model imports (lazy loaded)
-_classifier = None
-_model_loaded = False
-_model_load_error = None
+# Optional C Aho-Corasick automaton for the keyword engine
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
 
-def _load_ml_model():
-    """Lazy load the ProtectAI DeBERTa model."""
-    global _classifier, _model_loaded, _model_load_error
+# =====================================================
+# ML INFERENCE ENGINE (ProtectAI DeBERTa)
+# =====================================================
 
-    if _model_loaded:
-        return _classifier is not None
+ML_MODEL_ID = os.environ.get("ML_MODEL_ID", "protectai/deberta-v3-base-prompt-injection-v2")
+ML_BACKEND = os.environ.get("ML_BACKEND", "torch").lower()      # torch | onnx | onnx-int8
+ML_MAX_BATCH = int(os.environ.get("ML_MAX_BATCH", "16"))
+# How long the first request of a batch waits for others to join
+ML_MAX_WAIT_MS = float(os.environ.get("ML_MAX_WAIT_MS", "5"))
+ML_MAX_TOKENS = 512
+# Where the INT8 model is written on first use (reused afterwards)
+ML_ONNX_CACHE = os.environ.get("ML_ONNX_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".onnx-int8"))
 
-    try:
-        from transformers import pipeline
-        print("[STARTUP] Loading ProtectAI DeBERTa prompt-injection model...")
-        _classifier = pipeline(
-            "text-classification",
-            model="protectai/deberta-v3-base-prompt-injection-v2",
-            device=-1  # CPU; use 0 for GPU
+# Long inputs: overlapping token windows scored together instead of text[:512]
+ML_WINDOW_OVERLAP = int(os.environ.get("ML_WINDOW_OVERLAP", "64"))     # tokens shared by neighbouring windows
+ML_MAX_WINDOWS = int(os.environ.get("ML_MAX_WINDOWS", "32"))           # ~15k tokens per document
+ML_POOLING = os.environ.get("ML_POOLING", "max").lower()                # max | attention
+ML_EARLY_STOP = float(os.environ.get("ML_EARLY_STOP", "0.9"))           # stop once a window's INJECTION prob >= this
+
+ML_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _build_classifier(model_id: str, backend: str):
+    """text-classification pipeline on CPU for the requested backend."""
+    from transformers import AutoTokenizer, pipeline
+
+    if backend == "torch":
+        return pipeline("text-classification", model=model_id, device=-1)
+
+    # ONNX Runtime via optimum; the model repo ships an exported graph
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id, subfolder="onnx")
+    model = ORTModelForSequenceClassification.from_pretrained(model_id, subfolder="onnx")
+    if backend == "onnx-int8":
+        quantized = os.path.join(ML_ONNX_CACHE, "model_quantized.onnx")
+        if not os.path.exists(quantized):
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+            print(f"[STARTUP] Quantizing {model_id} to INT8 (one-time)...")
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            ORTQuantizer.from_pretrained(model).quantize(save_dir=ML_ONNX_CACHE, quantization_config=qconfig)
+        model = ORTModelForSequenceClassification.from_pretrained(ML_ONNX_CACHE, file_name="model_quantized.onnx")
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, device=-1)
+
+
+def _injection_index(config) -> int:
+    for label, index in config.label2id.items():
+        if label.upper() == "INJECTION":
+            return index
+    return 1
+
+
+def _inference_mode(backend: str):
+    if backend == "torch":
+        import torch
+        return torch.inference_mode()
+    return contextlib.nullcontext()
+
+
+def _softmax(logits: List[float]) -> List[float]:
+    peak = max(logits)
+    exps = [math.exp(x - peak) for x in logits]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+def _pool(scores: List[float]) -> float:
+    """Document INJECTION probability from per-window probabilities."""
+    if ML_POOLING == "attention":
+        # Windows attend by their own score: a single hot window dominates,
+        # while many lukewarm windows still add up
+        weights = _softmax([score * 10 for score in scores])
+        return sum(w * s for w, s in zip(weights, scores))
+    return max(scores)
+
+
+class _Pending:
+    __slots__ = ("text", "future", "queued_at")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future: Future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class InferenceEngine:
+    """
+    Warm, micro-batched classifier shared by every caller in the process.
+
+    load() builds the pipeline once and runs a warm-up batch, so no
+    request pays the model load. predict() is blocking and thread-safe:
+    requests queue up and a single worker thread runs them in batches of
+    up to max_batch, waiting at most max_wait_ms for a batch to fill.
+    Concurrent callers therefore share one padded forward pass instead of
+    running one each.
+    """
+
+    def __init__(self, model_id: str = ML_MODEL_ID, backend: str = ML_BACKEND,
+                 max_batch: int = ML_MAX_BATCH, max_wait_ms: float = ML_MAX_WAIT_MS):
+        if backend not in ML_BACKENDS:
+            print(f"[WARNING] Unknown ML_BACKEND '{backend}'; using torch.")
+            backend = "torch"
+        self.model_id = model_id
+        self.backend = backend
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.classifier = None
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._attempted = False
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stats = {"requests": 0, "batches": 0, "inference_seconds": 0.0, "queue_seconds": 0.0,
+                       "documents": 0, "windows": 0}
+
+    def load(self) -> bool:
+        """Loads and warms the model once; False if it cannot be loaded."""
+        if self._attempted:
+            return self.classifier is not None
+        with self._lock:
+            if self._attempted:
+                return self.classifier is not None
+            started = time.perf_counter()
+            try:
+                print(f"[STARTUP] Loading ProtectAI DeBERTa prompt-injection model ({self.backend})...")
+                classifier = _build_classifier(self.model_id, self.backend)
+                # Warm-up: first forward passes allocate buffers and pick kernels
+                classifier(["warm up"] * min(self.max_batch, 4), truncation=True, max_length=ML_MAX_TOKENS)
+                self.classifier = classifier
+                self.load_seconds = time.perf_counter() - started
+                self._worker = threading.Thread(target=self._run, name="trinetra-ml", daemon=True)
+                self._worker.start()
+                print(f"[STARTUP] ProtectAI model ready in {self.load_seconds:.1f}s.")
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"[WARNING] Failed to load ML model: {e}")
+                print("[WARNING] Falling back to heuristics-only mode.")
+            self._attempted = True
+            return self.classifier is not None
+
+    def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """One batched forward pass, bypassing the queue."""
+        return self.classifier(texts, batch_size=len(texts), truncation=True, max_length=ML_MAX_TOKENS)
+
+    def score_windows(self, text: str) -> Dict[str, Any]:
+        """
+        INJECTION probability of a long text, scored over overlapping
+        windows instead of its first 512 characters.
+
+        The text is tokenized once; the tokenizer's overflow support cuts
+        it into ML_MAX_TOKENS windows sharing ML_WINDOW_OVERLAP tokens, so
+        an injection straddling a boundary is whole in one window. Windows
+        run in batches of max_batch (usually one forward pass), stopping
+        as soon as one reaches ML_EARLY_STOP. Window scores are pooled by
+        max, or by attention (softmax-weighted over the scores).
+
+        At most ML_MAX_WINDOWS windows are scored; "truncated" is set when
+        the text runs past them, so a SAFE score covers only a prefix.
+        """
+        if not self.load():
+            raise RuntimeError(self.load_error or "ML model unavailable")
+        tokenizer, model = self.classifier.tokenizer, self.classifier.model
+        # Enough characters for ML_MAX_WINDOWS windows (~4 chars per token, with slack)
+        limit = ML_MAX_WINDOWS * (ML_MAX_TOKENS - ML_WINDOW_OVERLAP) * 6
+        truncated = len(text) > limit
+        text = text[:limit]
+        encoded = tokenizer(
+            text, truncation=True, max_length=ML_MAX_TOKENS, stride=ML_WINDOW_OVERLAP,
+            return_overflowing_tokens=True, padding=True,
+            return_tensors="pt" if self.backend == "torch" else "np",
         )
-        _model_loaded = True
-        print("[STARTUP] ProtectAI model loaded successfully.")
-        return True
-    except Exception as e:
-        _model_load_error = str(e)
-        _model_loaded = True  # Mark as attempted
-        print(f"[WARNING] Failed to load ML model: {e}")
-        print("[WARNING] Falling back to heuristics-only mode.")
-        return False
+        encoded.pop("overflow_to_sample_mapping", None)
+        inputs = {k: v for k, v in encoded.items() if k in ("input_ids", "attention_mask", "token_type_ids")}
+        windows = min(len(inputs["input_ids"]), ML_MAX_WINDOWS)
+        truncated = truncated or len(inputs["input_ids"]) > ML_MAX_WINDOWS
+        injection = _injection_index(model.config)
+
+        scores: List[float] = []
+        started = time.perf_counter()
+        with _inference_mode(self.backend):
+            for start in range(0, windows, self.max_batch):
+                end = min(start + self.max_batch, windows)
+                logits = model(**{k: v[start:end] for k, v in inputs.items()}).logits
+                scores.extend(_softmax(row)[injection] for row in logits.tolist())
+                if max(scores) >= ML_EARLY_STOP:
+                    break
+        with self._lock:
+            self._stats["documents"] += 1
+            self._stats["windows"] += len(scores)
+            self._stats["inference_seconds"] += time.perf_counter() - started
+
+        return {
+            "injection_score": _pool(scores),
+            "windows": len(inputs["input_ids"]),
+            "windows_scored": len(scores),
+            "max_window": scores.index(max(scores)),
+            "early_stop": len(scores) < windows,
+            "truncated": truncated,
+        }
+
+    def fits_one_window(self, text: str) -> bool:
+        """Whether text tokenizes to at most ML_MAX_TOKENS (special tokens
+        included). No vocabulary piece spans 32 characters, so longer
+        texts are not tokenized just to find out."""
+        if len(text) > ML_MAX_TOKENS * 32:
+            return False
+        return len(self.classifier.tokenizer(text)["input_ids"]) <= ML_MAX_TOKENS
+
+    def submit(self, text: str) -> Future:
+        pending = _Pending(text)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """{"label", "score"} for one text, batched with concurrent calls."""
+        if not self.load():
+            raise RuntimeError(self.load_error or "ML model unavailable")
+        return self.submit(text).result()
+
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                results = self.classify([p.text for p in batch])
+            except Exception as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["inference_seconds"] += elapsed
+                self._stats["queue_seconds"] += sum(started - p.queued_at for p in batch)
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        requests, batches = s["requests"], s["batches"]
+        return {
+            "backend": self.backend,
+            "loaded": self.classifier is not None,
+            "load_error": self.load_error,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds else None,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize(),
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "mean_inference_ms": round(s["inference_seconds"] / batches * 1000, 2) if batches else 0.0,
+            "mean_queue_ms": round(s["queue_seconds"] / requests * 1000, 2) if requests else 0.0,
+            "pooling": ML_POOLING,
+            "documents": s["documents"],
+            "mean_windows_per_document": round(s["windows"] / s["documents"], 2) if s["documents"] else 0.0,
+        }
+
+
+ML_ENGINE = InferenceEngine()
 
 
 def ml_detect(text: str) -> Dict[str, Any]:
     """Run ML-based detection using ProtectAI DeBERTa model."""
-    if not _load_ml_model() or _classifier is None:
+    if not ML_ENGINE.load():
         return {
             "ml_available": False,
-            "error": _model_load_error,
+            "error": ML_ENGINE.load_error,
             "label": None,
             "score": 0.0,
             "is_injection": False,
         }
 
     try:
-        # Truncate to model max length
-        truncated = text[:512] if len(text) > 512 else text
-        result = _classifier(truncated)[0]
+        windows = None
+        if ML_ENGINE.fits_one_window(text):
+            # Fits one window: share a micro-batch with concurrent callers
+            result = ML_ENGINE.predict(text)
+        else:
+            windows = ML_ENGINE.score_windows(text)
+            injection = windows.pop("injection_score")
+            result = ({"label": "INJECTION", "score": injection} if injection > 0.5
+                      else {"label": "SAFE", "score": 1.0 - injection})
 
         label = result["label"]  # "INJECTION" or "SAFE"
         score = result["score"]
@@ -66,6 +334,7 @@ def ml_detect(text: str) -> Dict[str, Any]:
             "score": score,
             "is_injection": is_injection,
             "confidence": score * 100,
+            "windows": windows,
         }
     except Exception as e:
         return {
@@ -77,6 +346,78 @@ def ml_detect(text: str) -> Dict[str, Any]:
         }
 
 
+# =====================================================
+# PATTERN REGISTRY (LINEAR-TIME)
+# =====================================================
+
+# Per-layer input caps (characters). Every pattern in this module runs in
+# linear time, so the caps bound worst-case latency on huge payloads.
+LAYER_LIMITS = {
+    "input": 1_000_000,          # raw text analyzed (longer input: first 1 MB)
+    "base64_scan": 262_144,      # prefix searched for encoded payloads
+    "base64_candidates": 64,     # decode attempts per request
+    "structure": 262_144,        # sentence-structure heuristics
+}
+
+
+class _SpanMatch:
+    """Minimal re.Match stand-in returned by OrderedSequence.search()."""
+
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int):
+        self.string, self._start, self._end = string, start, end
+
+    def group(self) -> str:
+        return self.string[self._start:self._end]
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+
+class OrderedSequence:
+    """
+    Linear-time equivalent of the regex `opener.*?keyword.*?closer`.
+
+    The lazy regex retries from every opener and rescans the rest of the
+    text each time (quadratic on e.g. a long run of quotes). The leftmost
+    match is fully determined by the first opener, the first keyword
+    after it and the first closer after that keyword, so three forward
+    searches find the same span. Like `.`, it assumes no newlines, which
+    normalized text never contains.
+    """
+
+    def __init__(self, opener: str, keyword: str, closer: str, flags: int = re.IGNORECASE):
+        self.pattern = f"{opener}.*?{keyword}.*?{closer}"
+        self._opener = re.compile(opener, flags)
+        self._keyword = re.compile(keyword, flags)
+        self._closer = re.compile(closer, flags)
+
+    def search(self, text: str) -> Optional[_SpanMatch]:
+        opener = self._opener.search(text)
+        if opener is None:
+            return None
+        keyword = self._keyword.search(text, opener.end())
+        if keyword is None:
+            return None
+        closer = self._closer.search(text, keyword.end())
+        if closer is None:
+            return None
+        return _SpanMatch(text, opener.start(), closer.end())
+
+
+# Every pattern used outside the intent/tactic tables, compiled once at import
+PATTERNS = {
+    "zero_width": re.compile(r"[\u200B-\u200D\uFEFF]"),
+    "whitespace": re.compile(r"\s+"),
+    "token": re.compile(r"\S+"),
+    "base64_run": re.compile(r"[A-Za-z0-9+/]{16,}={0,2}"),
+    "chained_steps": re.compile(r"(then|next|after that|finally|first|second)"),
+    "leading_imperative": re.compile(r"^(do|make|give|show|tell|print|display|reveal|ignore|forget)"),
+    "long_quoted": re.compile(r'["\']([^"\']{20,})["\']'),
+}
+
+
 # =====================================================
 # LAYER 0: NORMALIZATION
 # =====================================================
@@ -85,16 +426,18 @@ def normalize_input(text: str) -> str:
     """Normalize input text for consistent detection."""
     if not text:
         return ""
-    text = unicodedata.normalize("NFKC", text)
-    text = re.sub(r"[\u200B-\u200D\uFEFF]", "", text)
-    text = re.sub(r"\s+", " ", text)
+    text = unicodedata.normalize("NFKC", text[:LAYER_LIMITS["input"]])
+    text = PATTERNS["zero_width"].sub("", text)
+    text = PATTERNS["whitespace"].sub(" ", text)
     return text.strip().lower()
 
 
 def try_base64_decode(text: str) -> Optional[str]:
     """Attempt to decode base64 encoded content."""
-    b64_pattern = re.compile(r'[A-Za-z0-9+/]{16,}={0,2}')
-    for match in b64_pattern.finditer(text):
+    candidates = PATTERNS["base64_run"].finditer(text[:LAYER_LIMITS["base64_scan"]])
+    for attempt, match in enumerate(candidates):
+        if attempt >= LAYER_LIMITS["base64_candidates"]:
+            break
         try:
             candidate = match.group()
             if len(candidate) > 500:
@@ -107,6 +450,43 @@ def try_base64_decode(text: str) -> Optional[str]:
     return None
 
 
+class NormalizedText:
+    """
+    Per-request analysis context, normalized exactly once.
+
+    Carries the raw input, the normalized text every detector layer scans
+    (with any decoded base64 segment appended), the decoded segments and
+    lazily computed token offsets. Layers accept either this or a raw
+    string; a raw string is wrapped (and normalized) on the spot.
+    """
+
+    def __init__(self, raw: str, text: str, decoded: Tuple[str, ...] = ()):
+        self.raw = raw
+        self.text = text
+        self.decoded = decoded
+
+    @classmethod
+    def from_raw(cls, raw: str, decode_base64: bool = True) -> "NormalizedText":
+        text = normalize_input(raw)
+        decoded = try_base64_decode(raw) if decode_base64 else None
+        if not decoded:
+            return cls(raw, text)
+        # normalize(a + " " + b) == a + " " + normalize(b) for normalized a
+        extra = normalize_input(decoded)
+        return cls(raw, f"{text} {extra}" if extra else text, (decoded,))
+
+    @classmethod
+    def of(cls, text: Union[str, "NormalizedText"]) -> "NormalizedText":
+        if isinstance(text, NormalizedText):
+            return text
+        return cls.from_raw(text, decode_base64=False)
+
+    @cached_property
+    def token_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of whitespace-separated tokens in .text"""
+        return [m.span() for m in PATTERNS["token"].finditer(self.text)]
+
+
 # =====================================================
 # LAYER 1: INTENT CATEGORIES (EXPANDED)
 # =====================================================
@@ -178,6 +558,45 @@ INTENT_CATEGORIES = {
     },
 }
 
+# =====================================================
+# KEYWORD ENGINE (ALL CATEGORIES, ONE PASS)
+# =====================================================
+
+class KeywordEngine:
+    """
+    Finds every keyword and context word of INTENT_CATEGORIES in a text.
+
+    With pyahocorasick installed, a single automaton built at import finds
+    all phrases in one linear pass. Otherwise each distinct phrase is
+    searched once with str's C substring search (a pure-Python automaton
+    is slower than that). Matching is substring-based, like `kw in text`.
+    """
+
+    def __init__(self, phrases, use_automaton: bool = True):
+        self.phrases = tuple(sorted(set(phrases)))
+        self._automaton = None
+        if use_automaton and _ahocorasick is not None:
+            self._automaton = _ahocorasick.Automaton()
+            for phrase in self.phrases:
+                self._automaton.add_word(phrase, phrase)
+            self._automaton.make_automaton()
+
+    @property
+    def backend(self) -> str:
+        return "aho-corasick" if self._automaton is not None else "substring"
+
+    def find(self, text: str) -> Set[str]:
+        if self._automaton is not None:
+            return {phrase for _, phrase in self._automaton.iter(text)}
+        return {phrase for phrase in self.phrases if phrase in text}
+
+
+KEYWORD_ENGINE = KeywordEngine(
+    phrase
+    for data in INTENT_CATEGORIES.values()
+    for phrase in data["keywords"] + data["context_words"]
+)
+
 # =====================================================
 # LAYER 2: HIGH-RISK STANDALONE PATTERNS
 # =====================================================
@@ -215,7 +634,9 @@ MANIPULATION_TACTICS = {
         "risk_weight": 7,
     },
     "nested_instruction": {
-        "patterns": [r'["\'].*?(ignore|override|bypass|system).*?["\']', r"\[.*?(instruction|command|rule).*?\]"],
+        # Linear-time forms of '["\'].*?(...).*?["\']' and '\[.*?(...).*?\]'
+        "patterns": [OrderedSequence(r"[\"']", r"(ignore|override|bypass|system)", r"[\"']"),
+                     OrderedSequence(r"\[", r"(instruction|command|rule)", r"\]")],
         "risk_weight": 8,
     },
     "encoding_attempt": {
@@ -225,7 +646,7 @@ MANIPULATION_TACTICS = {
 }
 
 COMPILED_TACTICS = {
-    tactic: [re.compile(p, re.IGNORECASE) for p in data["patterns"]]
+    tactic: [re.compile(p, re.IGNORECASE) if isinstance(p, str) else p for p in data["patterns"]]
     for tactic, data in MANIPULATION_TACTICS.items()
 }
 
@@ -234,9 +655,9 @@ COMPILED_TACTICS = {
 # LAYER 4: DETECTION ENGINE
 # =====================================================
 
-def extract_intent(text: str) -> Dict[str, Any]:
+def extract_intent(text: Union[str, NormalizedText]) -> Dict[str, Any]:
     """Extract user intent from input text."""
-    normalized = normalize_input(text)
+    normalized = NormalizedText.of(text).text
     detected_intents = []
     total_risk = 0
 
@@ -254,14 +675,15 @@ def extract_intent(text: str) -> Dict[str, Any]:
             })
             total_risk += risk_weight * 0.95
 
-    # Check keyword + context combinations
+    # Check keyword + context combinations (one scan for all categories)
+    found = KEYWORD_ENGINE.find(normalized)
     for intent_name, intent_data in INTENT_CATEGORIES.items():
         # Skip if already detected by standalone pattern
         if any(d["intent"] == intent_name for d in detected_intents):
             continue
 
-        keyword_matches = [kw for kw in intent_data["keywords"] if kw in normalized]
-        context_matches = [cw for cw in intent_data["context_words"] if cw in normalized]
+        keyword_matches = [kw for kw in intent_data["keywords"] if kw in found]
+        context_matches = [cw for cw in intent_data["context_words"] if cw in found]
 
         if keyword_matches and context_matches:
             confidence = min(100, (len(keyword_matches) + len(context_matches)) * 20)
@@ -281,9 +703,9 @@ def extract_intent(text: str) -> Dict[str, Any]:
     }
 
 
-def detect_manipulation_tactics(text: str) -> Dict[str, Any]:
+def detect_manipulation_tactics(text: Union[str, NormalizedText]) -> Dict[str, Any]:
     """Detect behavioral manipulation tactics."""
-    normalized = normalize_input(text)
+    normalized = NormalizedText.of(text).text
     detected_tactics = []
     total_risk = 0
 
@@ -304,21 +726,23 @@ def detect_manipulation_tactics(text: str) -> Dict[str, Any]:
     }
 
 
-def analyze_sentence_structure(text: str) -> Dict[str, Any]:
+def analyze_sentence_structure(text: Union[str, NormalizedText]) -> Dict[str, Any]:
     """Analyze sentence structure for suspicious patterns."""
-    normalized = normalize_input(text)
+    normalized = NormalizedText.of(text).text
     flags = []
     risk = 0
 
-    if len(re.findall(r"(then|next|after that|finally|first|second)", normalized)) >= 3:
+    normalized = normalized[:LAYER_LIMITS["structure"]]
+    if sum(1 for _ in itertools.islice(PATTERNS["chained_steps"].finditer(normalized), 3)) >= 3:
         flags.append("chained_instructions")
         risk += 4
 
-    if len(re.findall(r"^(do|make|give|show|tell|print|display|reveal|ignore|forget)", normalized)) >= 2:
+    if len(PATTERNS["leading_imperative"].findall(normalized)) >= 2:
         flags.append("multiple_imperatives")
         risk += 3
 
-    for content in re.findall(r'["\']([^"\']{20,})["\']', normalized):
+    for match in PATTERNS["long_quoted"].finditer(normalized):
+        content = match.group(1)
         if any(kw in content for kw in ["ignore", "override", "system", "instruction", "bypass"]):
             flags.append("suspicious_quoted_content")
             risk += 6
@@ -405,17 +829,13 @@ def final_decision(text: str, use_ml: bool = True) -> Dict[str, Any]:
             "analysis": {},
         }
 
-    normalized = normalize_input(text)
-
-    # Check for encoded content
-    decoded = try_base64_decode(text)
-    if decoded:
-        normalized = normalized + " " + decoded
+    # Normalize (and decode encoded content) once for every layer
+    context = NormalizedText.from_raw(text)
 
     # Run heuristic detection layers
-    intent_result = extract_intent(normalized)
-    tactic_result = detect_manipulation_tactics(normalized)
-    structure_result = analyze_sentence_structure(normalized)
+    intent_result = extract_intent(context)
+    tactic_result = detect_manipulation_tactics(context)
+    structure_result = analyze_sentence_structure(context)
 
     # Calculate heuristic risk score
     heuristic_risk = (
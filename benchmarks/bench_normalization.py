@@ -0,0 +1,108 @@
+"""
+TRINETRA GUARD NORMALIZATION BENCHMARK
+Before/after for the heuristic guard's final_decision: the previous flow
+normalized the input once up front and again inside each of the three
+detector layers; NormalizedText normalizes once and is shared.
+
+Reports normalize_input passes, characters pushed through them (each pass
+allocates ~5 text-sized copies: NFKC, two re.sub, strip, lower), the
+tracemalloc peak and the time per request.
+
+Usage:
+    python benchmarks/bench_normalization.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Trinetra-Private-one--main"))
+
+import prompt_injection_guard as guard  # noqa: E402
+
+COPIES_PER_PASS = 5
+
+
+class PassCounter:
+    """Wraps guard.normalize_input to count passes and characters."""
+
+    def __init__(self):
+        self.original = guard.normalize_input
+        self.passes = 0
+        self.chars = 0
+
+    def __call__(self, text):
+        self.passes += 1
+        self.chars += len(text)
+        return self.original(text)
+
+
+def previous_flow(text: str):
+    """final_decision's heuristic layers as they ran before NormalizedText."""
+    normalized = guard.normalize_input(text)
+    decoded = guard.try_base64_decode(text)
+    if decoded:
+        normalized = normalized + " " + decoded
+    # Each layer re-normalized its (already normalized) input
+    guard.extract_intent(normalized)
+    guard.detect_manipulation_tactics(normalized)
+    guard.analyze_sentence_structure(normalized)
+
+
+def current_flow(text: str):
+    context = guard.NormalizedText.from_raw(text)
+    guard.extract_intent(context)
+    guard.detect_manipulation_tactics(context)
+    guard.analyze_sentence_structure(context)
+
+
+def sample(size: int) -> str:
+    line = "Please Summarize The Attached Report​;  figures are in   the appendix.\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def measure(flow, text: str, rounds: int):
+    counter = PassCounter()
+    guard.normalize_input = counter
+    try:
+        tracemalloc.start()
+        flow(text)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        passes, chars = counter.passes, counter.chars
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            flow(text)
+        elapsed = (time.perf_counter() - start) / rounds
+    finally:
+        guard.normalize_input = counter.original
+    return passes, chars, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heuristic guard normalization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 86)
+    print("GUARD NORMALIZATION BENCHMARK — previous flow vs NormalizedText")
+    print("=" * 86)
+    print(f"{'size':>10}{'flow':>10}{'passes':>8}{'M chars':>9}{'text copies':>13}"
+          f"{'peak MB':>9}{'ms/req':>10}{'speedup':>9}")
+
+    for size in args.sizes:
+        text = sample(size)
+        baseline = None
+        for name, flow in (("previous", previous_flow), ("current", current_flow)):
+            passes, chars, peak, elapsed = measure(flow, text, args.rounds)
+            baseline = baseline or elapsed
+            print(f"{size:>10}{name:>10}{passes:>8}{chars / 1e6:>9.2f}{passes * COPIES_PER_PASS:>13}"
+                  f"{peak / 1e6:>9.1f}{elapsed * 1e3:>10.1f}{baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
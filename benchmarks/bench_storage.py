@@ -0,0 +1,169 @@
+"""
+TRINETRA STORAGE BENCHMARK
+Write throughput of scan logging: the previous save_scan_record (a new
+connection per insert, rollback journal, synchronous=FULL) against the
+pooled per-thread WAL connections from storage.py.
+
+--threads writer threads insert --writes rows each while --readers
+threads run the /logs query in a loop, as the server does when the
+dashboard polls during scans. Reports inserts/s, p50/p99 insert latency
+and reads completed. Each mode writes to its own temporary database.
+
+Usage:
+    python benchmarks/bench_storage.py --threads 1 4 16 --writes 500 --readers 2
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import storage  # noqa: E402
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS scans (
+        scan_id TEXT PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        input_value TEXT NOT NULL,
+        input_type TEXT DEFAULT 'text',
+        status TEXT DEFAULT 'completed',
+        verdict TEXT NOT NULL,
+        confidence REAL DEFAULT 0.95,
+        reason TEXT,
+        analysis TEXT
+    )
+'''
+INSERT = '''
+    INSERT INTO scans (scan_id, timestamp, input_value, verdict, confidence, reason, analysis)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+LOGS = "SELECT scan_id, timestamp, input_value, verdict, reason FROM scans ORDER BY timestamp DESC LIMIT 50"
+ANALYSIS = "The page reports the latest figures from the central bank. " * 20
+
+
+def row():
+    return (str(uuid.uuid4()), datetime.now().isoformat(), "What is the current repo rate?",
+            "SAFE", 0.97, "No threats detected", ANALYSIS)
+
+
+class PerCall:
+    """save_scan_record and /logs as they were: connect, run, close."""
+
+    name = "per-call"
+
+    def __init__(self, path):
+        self.path = path
+        conn = sqlite3.connect(path)
+        conn.execute(SCHEMA)
+        conn.commit()
+        conn.close()
+
+    def insert(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(INSERT, row())
+        conn.commit()
+        conn.close()
+
+    def read(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(LOGS).fetchall()
+        conn.close()
+
+
+class Pooled:
+    """storage.Database: per-thread WAL connection, cached statements."""
+
+    name = "pooled-wal"
+
+    def __init__(self, path):
+        self.db = storage.Database(path)
+        with self.db.connection() as conn:
+            conn.execute(SCHEMA)
+
+    def insert(self):
+        with self.db.connection() as conn:
+            conn.execute(INSERT, row())
+
+    def read(self):
+        with self.db.connection() as conn:
+            conn.execute(LOGS).fetchall()
+
+
+def run(mode, threads: int, writes: int, readers: int):
+    latencies = []
+    lock = threading.Lock()
+    done = threading.Event()
+    reads = [0]
+
+    def writer():
+        local = []
+        for _ in range(writes):
+            started = time.perf_counter()
+            mode.insert()
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    def reader():
+        while not done.is_set():
+            mode.read()
+            with lock:
+                reads[0] += 1
+
+    background = [threading.Thread(target=reader) for _ in range(readers)]
+    for t in background:
+        t.start()
+    started = time.perf_counter()
+    workers = [threading.Thread(target=writer) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for t in background:
+        t.join()
+
+    ordered = sorted(latencies)
+    return {
+        "rate": len(latencies) / elapsed,
+        "p50": statistics.median(ordered) * 1e3,
+        "p99": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1e3,
+        "reads": reads[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite storage write-throughput benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writes", type=int, default=500, help="inserts per writer thread")
+    parser.add_argument("--readers", type=int, default=2, help="concurrent /logs readers")
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"STORAGE BENCHMARK — {args.writes} inserts per writer, {args.readers} readers")
+    print("=" * 78)
+    print(f"{'mode':>12}{'writers':>9}{'inserts/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'reads':>8}{'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in args.threads:
+            baseline = None
+            for mode_cls in (PerCall, Pooled):
+                path = os.path.join(tmp, f"{mode_cls.name}-{threads}.db")
+                result = run(mode_cls(path), threads, args.writes, args.readers)
+                baseline = baseline or result["rate"]
+                print(f"{mode_cls.name:>12}{threads:>9}{result['rate']:>11.0f}{result['p50']:>9.2f}"
+                      f"{result['p99']:>9.2f}{result['reads']:>8}{result['rate'] / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+TRINETRA TEXT EXTRACTION BENCHMARK
+Compares the extraction backends in text_extraction.py over a corpus of
+saved HTML pages: HTML chars/sec, Python heap peak and process RSS growth.
+
+Usage:
+    python benchmarks/bench_text_extraction.py --corpus path/to/html_pages
+    python benchmarks/bench_text_extraction.py            # synthetic corpus
+
+Save a corpus with e.g. `curl -L https://www.kitco.com > corpus/kitco.html`.
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import gc
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import text_extraction  # noqa: E402
+
+
+def synthetic_corpus(pages: int = 20) -> List[str]:
+    """News-like pages: heavy head/scripts/nav, then article paragraphs."""
+    corpus = []
+    for n in range(pages):
+        head = "<script>" + "var a=1;" * 20000 + "</script><style>" + "p{}" * 5000 + "</style>"
+        nav = "<nav>" + "".join(f"<a href='/{i}'>Link {i}</a>" for i in range(400)) + "</nav>"
+        body = "".join(
+            f"<div class='c'><p>Page {n} paragraph {i}: gold traded at &#8377;{i * 7} per gram.</p>"
+            f"<aside>Advertisement</aside></div>"
+            for i in range(3000)
+        )
+        corpus.append(f"<html><head>{head}</head><body><header>Top</header>{nav}{body}"
+                      f"<footer>Footer</footer></body></html>")
+    return corpus
+
+
+def load_corpus(path: str) -> List[str]:
+    files = sorted(Path(path).glob("**/*.htm*"))
+    return [f.read_text(encoding="utf-8", errors="replace") for f in files]
+
+
+def run_full(backend: str, corpus: List[str], max_chars: int) -> int:
+    out = 0
+    for html in corpus:
+        out += len(text_extraction.extract_text(html, max_chars, backend))
+    return out
+
+
+def run_streaming(backend: str, corpus: List[str], max_chars: int, chunk: int = 16384) -> int:
+    out = 0
+    for html in corpus:
+        extractor = text_extraction.new_streaming_extractor(max_chars, backend)
+        for i in range(0, len(html), chunk):
+            if extractor.feed_chunk(html[i:i + chunk]):
+                break
+        out += len(extractor.text())
+    return out
+
+
+def _peak_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss():
+    """Linux: reset VmHWM so the peak reflects only the extraction run."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _current_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(mode: str, backend: str, corpus: List[str], max_chars: int, rounds: int) -> Dict[str, float]:
+    """Runs in a fresh process so peak RSS growth is attributable to one backend."""
+    runner = run_full if mode == "full" else run_streaming
+    gc.collect()
+    _reset_peak_rss()
+    rss_before = _current_rss_kb()
+
+    tracemalloc.start()
+    runner(backend, corpus, max_chars)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    html_chars = sum(len(h) for h in corpus)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        out_chars = runner(backend, corpus, max_chars)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    return {
+        "seconds_per_corpus": elapsed,
+        "html_chars_per_sec": html_chars / elapsed if elapsed else 0.0,
+        "text_chars": out_chars,
+        "heap_peak_mb": heap_peak / 1e6,
+        "rss_growth_mb": (_peak_rss_kb() - rss_before) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text extraction backend benchmark")
+    parser.add_argument("--corpus", help="directory of saved .html pages")
+    parser.add_argument("--max-chars", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    if not corpus:
+        sys.exit(f"No .html files found under {args.corpus}")
+
+    total_mb = sum(len(h) for h in corpus) / 1e6
+    print("=" * 78)
+    print(f"TEXT EXTRACTION BENCHMARK — {len(corpus)} pages, {total_mb:.1f} M chars, max_chars={args.max_chars}")
+    print("=" * 78)
+    print(f"{'mode':<10}{'backend':<12}{'s/corpus':>10}{'M chars/s':>12}{'heap MB':>10}{'RSS +MB':>10}{'speedup':>9}")
+
+    ctx = multiprocessing.get_context("spawn")
+    # Baseline first: full/bs4 is the previous fetch_page_content path
+    cases = [("full", "bs4")]
+    cases += [("full", b) for b in text_extraction.available_backends() if b != "bs4"]
+    cases += [("streaming", b) for b in text_extraction.STREAMING_BACKENDS]
+
+    baseline = None
+    for mode, backend in cases:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            r = pool.submit(measure, mode, backend, corpus, args.max_chars, args.rounds).result()
+        baseline = baseline or r["seconds_per_corpus"]
+        speedup = baseline / r["seconds_per_corpus"]
+        print(f"{mode:<10}{backend:<12}{r['seconds_per_corpus']:>10.3f}{r['html_chars_per_sec'] / 1e6:>12.2f}"
+              f"{r['heap_peak_mb']:>10.1f}{r['rss_growth_mb']:>10.1f}{speedup:>8.1f}x")
+
+    print("\nbaseline = full/bs4 (the previous fetch_page_content path).")
+    print("heap MB is tracemalloc (Python allocations only); RSS +MB includes C parsers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+TRINETRA GUARD REGEX FUZZ / PERF HARNESS
+Checks the heuristic guard's pattern registry for catastrophic or
+super-linear backtracking and for behavioural drift.
+
+1. Equivalence: every linear-time rewrite (OrderedSequence) must return
+   the same span as the regex it replaces, on random short inputs drawn
+   from an alphabet of quotes, brackets and keyword fragments.
+2. Growth: each pattern is timed on adversarial inputs of size n and 2n;
+   a ratio well above 2 (default limit 3) is flagged as super-linear.
+3. Budget: final_decision(use_ml=False) on 1 MB adversarial payloads must
+   finish within --budget seconds.
+
+Exits non-zero when any check fails, so it can gate CI.
+
+Usage:
+    python benchmarks/fuzz_guard_regex.py --cases 20000 --size 64000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Trinetra-Private-one--main"))
+
+import prompt_injection_guard as guard  # noqa: E402
+
+FRAGMENTS = ['"', "'", "[", "]", " ", "a", "x", "ignore", "override", "bypass", "system",
+             "instruction", "command", "rule", "then", "first", "do "]
+
+# Inputs that drive backtracking in naive forms of the patterns
+ADVERSARIAL = {
+    "quotes": '"',
+    "open_brackets": "[",
+    "quote_keyword": "\"system ",
+    "bracket_keyword": "[rule ",
+    "base64_run": "QUFB",
+    "base64_words": "QUFBQUFBQUFBQUFBQUFBQQ ",
+    "whitespace": " \t​",
+    "chained": "then ",
+    "long_quote": "'" + "y" * 19,
+}
+
+
+def tiled(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def registry():
+    """(name, search callable) for every pattern the guard runs."""
+    entries = [(f"PATTERNS.{name}", rx.search) for name, rx in guard.PATTERNS.items()]
+    entries += [(f"HIGH_RISK.{intent}.{i}", rx.search)
+                for i, (rx, intent, _) in enumerate(guard.COMPILED_PATTERNS)]
+    entries += [(f"TACTIC.{tactic}.{i}", p.search)
+                for tactic, patterns in guard.COMPILED_TACTICS.items() for i, p in enumerate(patterns)]
+    return entries
+
+
+def check_equivalence(cases: int, seed: int) -> int:
+    rng = random.Random(seed)
+    sequences = [p for patterns in guard.COMPILED_TACTICS.values()
+                 for p in patterns if isinstance(p, guard.OrderedSequence)]
+    failures = 0
+    for seq in sequences:
+        reference = re.compile(seq.pattern, re.IGNORECASE)
+        for _ in range(cases):
+            text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+            expected = reference.search(text)
+            actual = seq.search(text)
+            if (expected and expected.span()) != (actual and actual.span()):
+                failures += 1
+                if failures <= 5:
+                    print(f"  MISMATCH {seq.pattern!r} on {text!r}: "
+                          f"{expected and expected.span()} vs {actual and actual.span()}")
+        print(f"  {seq.pattern:<50} {cases} cases")
+    return failures
+
+
+def check_growth(size: int, limit: float) -> int:
+    flagged = 0
+    for name, search in registry():
+        worst = (0.0, "", 0.0)
+        for label, unit in ADVERSARIAL.items():
+            timings = []
+            for n in (size, 2 * size):
+                text = tiled(unit, n)
+                start = time.perf_counter()
+                search(text)
+                timings.append(time.perf_counter() - start)
+            # Below ~1 ms the ratio is timer noise
+            ratio = timings[1] / timings[0] if timings[0] > 1e-3 else 0.0
+            if ratio >= worst[0]:
+                worst = (ratio, label, timings[1])
+        ratio, label, elapsed = worst
+        status = "SUPER-LINEAR" if ratio > limit else "ok"
+        flagged += status != "ok"
+        print(f"  {name:<42}{label:>16}{elapsed * 1e3:>10.2f} ms{ratio:>8.2f}x  {status}")
+    return flagged
+
+
+def check_budget(size: int, budget: float) -> int:
+    over = 0
+    for label, unit in ADVERSARIAL.items():
+        text = tiled(unit, size)
+        start = time.perf_counter()
+        guard.final_decision(text, use_ml=False)
+        elapsed = time.perf_counter() - start
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        over += status != "ok"
+        print(f"  {label:<18}{elapsed * 1e3:>10.1f} ms  {status}")
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heuristic guard regex fuzz / perf harness")
+    parser.add_argument("--cases", type=int, default=20_000, help="random inputs per rewritten pattern")
+    parser.add_argument("--size", type=int, default=64_000, help="base adversarial size for the growth check")
+    parser.add_argument("--payload", type=int, default=1_000_000, help="adversarial size for the budget check")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds allowed per final_decision")
+    parser.add_argument("--growth-limit", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 86)
+    print("GUARD REGEX FUZZ / PERF HARNESS")
+    print("=" * 86)
+
+    print("\n[1] Equivalence with the original regexes")
+    mismatches = check_equivalence(args.cases, args.seed)
+
+    print(f"\n[2] Growth from {args.size} to {2 * args.size} chars (worst adversarial input)")
+    flagged = check_growth(args.size, args.growth_limit)
+
+    print(f"\n[3] final_decision(use_ml=False) on {args.payload} char payloads")
+    over = check_budget(args.payload, args.budget)
+
+    print(f"\nmismatches={mismatches} super_linear={flagged} over_budget={over}")
+    sys.exit(1 if mismatches or flagged or over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+TRINETRA LOAD TEST
+Fires concurrent /scan requests at a running backend and reports how
+throughput scales with the number of in-flight requests.
+
+Usage:
+    python main.py                          # in another terminal
+    python benchmarks/load_test.py --levels 1 2 4 8 16 --requests 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PROMPTS = [
+    "What is the capital of France?",
+    "Explain recursion in simple terms",
+    "What is the current gold price in India?",
+    "Latest news about the RBI repo rate",
+]
+
+
+# Request body field expected by each endpoint
+BODY_FIELDS = {"/scan": "payload", "/detect": "prompt"}
+
+
+async def timed_request(client: httpx.AsyncClient, url: str, text: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(url, json={BODY_FIELDS[url]: text})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run_level(base_url: str, endpoint: str, concurrency: int,
+                    total: int, prompts: List[str]) -> Dict[str, float]:
+    """Runs `total` requests with at most `concurrency` in flight."""
+    limiter = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def worker(i: int):
+            nonlocal errors
+            async with limiter:
+                try:
+                    latencies.append(await timed_request(client, endpoint, prompts[i % len(prompts)]))
+                except Exception:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_s": round(statistics.median(latencies), 3) if latencies else 0.0,
+        "p95_s": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3) if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent /scan load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", default="/scan", choices=list(BODY_FIELDS))
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per level")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"TRINETRA LOAD TEST — {args.base_url}{args.endpoint}")
+    print("=" * 72)
+    print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'elapsed':>9} {'req/s':>8} {'p50':>8} {'p95':>8}")
+
+    baseline = None
+    for level in args.levels:
+        r = await run_level(args.base_url, args.endpoint, level, args.requests, DEFAULT_PROMPTS)
+        baseline = baseline or r["throughput_rps"]
+        scale = r["throughput_rps"] / baseline if baseline else 0.0
+        print(f"{r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['elapsed_s']:>8}s "
+              f"{r['throughput_rps']:>8} {r['p50_s']:>7}s {r['p95_s']:>7}s  x{scale:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+# ==================================================
+# TRINETRA CPU POOL
+# Process-pool offload for CPU-bound guard and parsing work
+# ==================================================
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import perf_metrics
+
+CPU_POOL_ENABLED = os.environ.get("CPU_POOL_ENABLED", "1") == "1"
+CPU_POOL_WORKERS = int(os.environ.get("CPU_POOL_WORKERS", "2"))
+# Tasks allowed to wait for a worker; beyond this callers get a 503
+CPU_POOL_MAX_QUEUE = int(os.environ.get("CPU_POOL_MAX_QUEUE", "16"))
+CPU_POOL_RETRY_AFTER = int(os.environ.get("CPU_POOL_RETRY_AFTER", "1"))
+# module or module:function, run in every worker before its first task
+CPU_POOL_PRELOAD = tuple(p.strip() for p in os.environ.get(
+    "CPU_POOL_PRELOAD", "prompt_injection_guard:warm_ml_tier,text_extraction"
+).split(",") if p.strip())
+
+
+class CPUPoolSaturated(Exception):
+    """Raised instead of queueing when the pool's backlog is full."""
+
+    def __init__(self, retry_after: int = CPU_POOL_RETRY_AFTER):
+        super().__init__("CPU pool is at capacity")
+        self.retry_after = retry_after
+
+
+def _warm_worker(preload: Tuple[str, ...]):
+    """Worker initializer: imports modules and loads models up front, so
+    no task pays for them."""
+    for target in preload:
+        module, _, func = target.partition(":")
+        try:
+            loaded = importlib.import_module(module)
+            if func:
+                getattr(loaded, func)()
+        except Exception as e:
+            print(f"[WARNING] CPU pool worker could not preload {target}: {e}")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class CPUPool:
+    """
+    Process pool for work that holds the GIL (heuristic guard, DeBERTa,
+    HTML parsing), keeping it off the uvicorn process that serves
+    requests.
+
+    Workers are spawned (not forked: the server process has threads) and
+    warmed by CPU_POOL_PRELOAD at start. Spawn also re-imports the
+    parent's __main__ script in each worker, so that script's module
+    level must stay side-effect free. At most workers + max_queue
+    tasks are admitted; run() raises CPUPoolSaturated past that, so an
+    overloaded server sheds load with a 503 instead of growing latency.
+    With CPU_POOL_ENABLED=0, run() falls back to the thread pool.
+    """
+
+    def __init__(self, workers: int = CPU_POOL_WORKERS, max_queue: int = CPU_POOL_MAX_QUEUE,
+                 preload: Tuple[str, ...] = CPU_POOL_PRELOAD, enabled: bool = CPU_POOL_ENABLED):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.preload = preload
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._admitted = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                    initargs=(self.preload,),
+                )
+            return self._executor
+
+    def start(self):
+        """Spawns and warms every worker (blocking); call at startup."""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        pool = self._pool()
+        # Enough concurrent pings that every worker is spawned (and warmed)
+        for future in [pool.submit(_ping) for _ in range(self.workers * 2)]:
+            future.result()
+        print(f"[STARTUP] CPU pool ready: {self.workers} workers in {time.perf_counter() - started:.1f}s.")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _: Future):
+        with self._lock:
+            self._admitted -= 1
+
+    async def run(self, fn: Callable[..., Any], *args):
+        """fn(*args) in a worker process; fn and its arguments must be
+        picklable (module-level function, plain data)."""
+        if not self.enabled:
+            return await asyncio.to_thread(fn, *args)
+
+        with self._lock:
+            if self._admitted >= self.capacity:
+                perf_metrics.incr("cpu_pool.rejected")
+                raise CPUPoolSaturated()
+            self._admitted += 1
+        try:
+            future = self._pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self.shutdown()
+            raise
+        # Released when the worker finishes, even if the caller was
+        # cancelled meanwhile: the slot is busy until then
+        future.add_done_callback(self._release)
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM): start a fresh pool on the next task
+            perf_metrics.incr("cpu_pool.broken")
+            self.shutdown()
+            raise
+        finally:
+            perf_metrics.observe(f"cpu_pool.{fn.__name__}", time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            admitted = self._admitted
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(admitted, self.workers),
+            "queued": max(0, admitted - self.workers),
+            "rejected": perf_metrics.get_counter("cpu_pool.rejected"),
+            "broken": perf_metrics.get_counter("cpu_pool.broken"),
+        }
+
+
+_cpu_pool: Optional[CPUPool] = None
+_cpu_pool_lock = threading.Lock()
+
+
+def get_cpu_pool() -> CPUPool:
+    global _cpu_pool
+    with _cpu_pool_lock:
+        if _cpu_pool is None:
+            _cpu_pool = CPUPool()
+        return _cpu_pool
@@ -0,0 +1,171 @@
+# ==================================================
+# TRINETRA CREDIBILITY STORE
+# Durable per-domain credibility verdicts (SQLite)
+# ==================================================
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import perf_metrics
+import storage
+
+CREDIBILITY_TTL = int(os.environ.get("CREDIBILITY_TTL", str(7 * 86400)))
+# Rejections are re-checked sooner: sites improve, and a NO costs us sources
+CREDIBILITY_NEGATIVE_TTL = int(os.environ.get("CREDIBILITY_NEGATIVE_TTL", str(86400)))
+CREDIBILITY_MAX_ENTRIES = int(os.environ.get("CREDIBILITY_MAX_ENTRIES", "5000"))
+
+# Topic families: a verdict for a domain holds for every prompt in the
+# same family, so "gold price today" and "gold rate in Mumbai" share it.
+TOPIC_FAMILIES = {
+    "precious_metals": ("gold", "silver", "platinum", "bullion", "karat", "carat", "mcx", "ibja"),
+    "finance": ("stock", "share price", "market", "sensex", "nifty", "nasdaq", "dow", "inflation",
+                "interest rate", "repo rate", "rbi", "fed", "bond", "crypto", "bitcoin",
+                "currency", "rupee", "dollar", "gdp", "earnings", "ipo"),
+    "gaming": ("game", "gta", "playstation", "xbox", "nintendo", "steam", "rockstar", "esports"),
+    "health": ("health", "disease", "covid", "vaccine", "symptom", "medicine", "drug", "world health",
+               "hospital", "virus", "cancer"),
+    "science": ("research", "paper", "study", "physics", "chemistry", "biology", "nasa", "space",
+                "climate", "arxiv", "quantum"),
+    "technology": ("ai", "software", "iphone", "android", "chip", "processor", "launch", "openai",
+                   "google", "microsoft", "apple", "llm"),
+    "government": ("election", "government", "policy", "minister", "parliament", "law", "court",
+                   "budget", "tax", "visa"),
+    "sports": ("cricket", "football", "ipl", "fifa", "olympics", "match", "score", "tennis"),
+    "weather": ("weather", "rain", "monsoon", "cyclone", "temperature", "forecast"),
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def topic_family(topic: str) -> str:
+    """Coarse topic class of a prompt; 'general' when nothing matches."""
+    text = topic.lower()
+    words = set(_WORD_RE.findall(text))
+    best, best_hits = "general", 0
+    for family, keywords in TOPIC_FAMILIES.items():
+        hits = sum(1 for kw in keywords if (kw in text if " " in kw else kw in words))
+        if hits > best_hits:
+            best, best_hits = family, hits
+    return best
+
+
+class CredibilityStore:
+    """
+    Credibility verdicts keyed by (domain, topic family) in trinetra.db.
+
+    Shared by every uvicorn worker and kept across restarts, so
+    llm_credibility_score runs once per domain and topic family until the
+    TTL lapses. Entry count is bounded by LRU eviction on last access.
+    Methods are blocking; call them via asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = CREDIBILITY_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = storage.connect(self.db_path)
+        if not self._schema_ready:
+            with self._lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS domain_credibility (
+                        domain TEXT NOT NULL,
+                        topic_family TEXT NOT NULL,
+                        is_credible INTEGER NOT NULL,
+                        reason TEXT,
+                        created_at REAL NOT NULL,
+                        expires_at REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        PRIMARY KEY (domain, topic_family)
+                    )
+                ''')
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_credibility_access "
+                             "ON domain_credibility(last_access)")
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    def get(self, domain: str, family: str) -> Optional[Tuple[bool, str]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT is_credible, reason FROM domain_credibility
+                WHERE domain = ? AND topic_family = ? AND expires_at > ?
+            ''', (domain, family, now)).fetchone()
+            if row is None:
+                perf_metrics.incr("credibility.misses")
+                return None
+
+            perf_metrics.incr("credibility.hits")
+            conn.execute('''
+                UPDATE domain_credibility SET last_access = ?
+                WHERE domain = ? AND topic_family = ?
+            ''', (now, domain, family))
+            conn.commit()
+            return bool(row[0]), row[1]
+
+    def get_many(self, domains: List[str], family: str) -> Dict[str, Tuple[bool, str]]:
+        """Cached verdicts for several domains in one round-trip."""
+        if not domains:
+            return {}
+        now = time.time()
+        with self._connect() as conn:
+            placeholders = ",".join("?" * len(domains))
+            rows = conn.execute(f'''
+                SELECT domain, is_credible, reason FROM domain_credibility
+                WHERE topic_family = ? AND expires_at > ? AND domain IN ({placeholders})
+            ''', (family, now, *domains)).fetchall()
+            if rows:
+                conn.executemany('''
+                    UPDATE domain_credibility SET last_access = ?
+                    WHERE domain = ? AND topic_family = ?
+                ''', [(now, r[0], family) for r in rows])
+                conn.commit()
+
+        perf_metrics.incr("credibility.hits", len(rows))
+        perf_metrics.incr("credibility.misses", len(domains) - len(rows))
+        return {r[0]: (bool(r[1]), r[2]) for r in rows}
+
+    def put(self, domain: str, family: str, is_credible: bool, reason: str):
+        now = time.time()
+        ttl = CREDIBILITY_TTL if is_credible else CREDIBILITY_NEGATIVE_TTL
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO domain_credibility
+                (domain, topic_family, is_credible, reason, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (domain, family, int(is_credible), reason, now, now + ttl, now))
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute("DELETE FROM domain_credibility WHERE expires_at <= ?", (now,)).rowcount
+        count = conn.execute("SELECT COUNT(*) FROM domain_credibility").fetchone()[0]
+        overflow = max(0, count - self.max_entries)
+        if overflow:
+            conn.execute('''
+                DELETE FROM domain_credibility WHERE rowid IN (
+                    SELECT rowid FROM domain_credibility ORDER BY last_access ASC LIMIT ?
+                )
+            ''', (overflow,))
+        perf_metrics.incr("credibility.evictions", expired + overflow)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = perf_metrics.get_counter("credibility.hits")
+        misses = perf_metrics.get_counter("credibility.misses")
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM domain_credibility").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "evictions": perf_metrics.get_counter("credibility.evictions"),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
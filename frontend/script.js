@@ -383,6 +383,64 @@ function syncScroll() {
     }
 }
 
+// Server verdict for the text as of the last typing pause.
+// /scan reuses its signed token instead of re-running the guard.
+let serverVerdict = { text: null, token: null };
+let detectTimer = null;
+const DETECT_DEBOUNCE_MS = 800;
+
+// Streaming detection: one socket per editor, debounced server-side.
+// Every edit is sent; the server cancels superseded evaluations.
+let detectSocket = null;
+let detectSeq = 0;
+const sentTexts = new Map();
+
+function connectDetectStream() {
+    if (!('WebSocket' in window)) return;
+    const socket = new WebSocket('ws://127.0.0.1:8000/detect/stream');
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        const text = sentTexts.get(data.seq);
+        // Only the reply to the latest edit describes the current text
+        if (data.seq === detectSeq && text === scannerInput.value && data.verdict_token) {
+            serverVerdict = { text, token: data.verdict_token };
+        }
+        for (const seq of sentTexts.keys()) {
+            if (seq <= data.seq) sentTexts.delete(seq);
+        }
+    };
+    socket.onclose = () => {
+        detectSocket = null;
+        setTimeout(connectDetectStream, 3000);
+    };
+    detectSocket = socket;
+}
+
+function streamText(text) {
+    if (!detectSocket || detectSocket.readyState !== WebSocket.OPEN) return false;
+    detectSeq += 1;
+    sentTexts.set(detectSeq, text);
+    detectSocket.send(JSON.stringify({ seq: detectSeq, text }));
+    return true;
+}
+
+async function prefetchServerVerdict(text) {
+    try {
+        const response = await fetch('http://127.0.0.1:8000/detect', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ prompt: text })
+        });
+        const data = await response.json();
+        // Ignore replies for text the user has since changed
+        if (scannerInput.value === text && data.verdict_token) {
+            serverVerdict = { text, token: data.verdict_token };
+        }
+    } catch (err) {
+        // Best effort: /scan scores the text itself without a token
+    }
+}
+
 // Live detection on EVERY keystroke
 if (scannerInput) {
     scannerInput.addEventListener('input', (e) => {
@@ -396,8 +454,16 @@ if (scannerInput) {
 
         // Update button + alert
         updateSecurityUI(result);
+
+        // Server-side guard: stream every edit, or POST once typing pauses
+        clearTimeout(detectTimer);
+        if (text.trim() && !streamText(text)) {
+            detectTimer = setTimeout(() => prefetchServerVerdict(text), DETECT_DEBOUNCE_MS);
+        }
     });
 
+    connectDetectStream();
+
     scannerInput.addEventListener('scroll', syncScroll);
 }
 
@@ -423,7 +489,10 @@ analyzeBtn.addEventListener('click', async () => {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ payload: input })
+            body: JSON.stringify({
+                payload: input,
+                verdict_token: serverVerdict.text === input ? serverVerdict.token : null
+            })
         });
 
         const data = await response.json();
@@ -480,6 +549,12 @@ analyzeBtn.addEventListener('click', async () => {
             typeWriter(formattedOutput, 0);
             addToLogs('SYS_RESPONSE', 'Analysis Received', 'LOW');
 
+        } else if (response.status === 503) {
+            // Server shed load (CPU pool full or Groq budget exhausted): nothing was scanned
+            typeWriter(`> [TRINETRA CORE BUSY]\n> Too many scans in progress.\n> Retry in ${data.retry_after || 1}s.`, 0);
+            analyzeBtn.querySelector('.btn-text').innerText = 'RETRY';
+            addToLogs('SYS_WARNING', 'Core busy (503)', 'MEDIUM');
+
         } else {
             // Legacy fallback
             if (data.analysis) {
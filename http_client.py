@@ -0,0 +1,333 @@
+# ==================================================
+# TRINETRA HTTP CLIENT
+# Shared, pooled keep-alive client for the URL Fetcher Agent
+# ==================================================
+
+import asyncio
+import codecs
+import contextlib
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+from urllib.parse import urlparse
+
+import httpx
+
+import perf_metrics
+
+# ==================================================
+# CONFIGURATION (env overridable)
+# ==================================================
+
+FETCH_MAX_CONNECTIONS = int(os.environ.get("FETCH_MAX_CONNECTIONS", "50"))
+FETCH_MAX_KEEPALIVE = int(os.environ.get("FETCH_MAX_KEEPALIVE", "20"))
+FETCH_MAX_PER_HOST = int(os.environ.get("FETCH_MAX_PER_HOST", "4"))
+# Process-wide cap on in-flight fetches across all concurrent scans
+FETCH_GLOBAL_LIMIT = int(os.environ.get("FETCH_GLOBAL_LIMIT", "24"))
+# Politeness: minimum spacing (seconds) between request starts to one host
+FETCH_HOST_INTERVAL = float(os.environ.get("FETCH_HOST_INTERVAL", "0.2"))
+FETCH_KEEPALIVE_EXPIRY = float(os.environ.get("FETCH_KEEPALIVE_EXPIRY", "30"))
+FETCH_CONNECT_TIMEOUT = float(os.environ.get("FETCH_CONNECT_TIMEOUT", "3"))
+FETCH_READ_TIMEOUT = float(os.environ.get("FETCH_READ_TIMEOUT", "5"))
+FETCH_TOTAL_TIMEOUT = float(os.environ.get("FETCH_TOTAL_TIMEOUT", "8"))
+FETCH_HTTP2 = os.environ.get("FETCH_HTTP2", "0") == "1"
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(512 * 1024)))
+# Hosts tracked per loop before idle ones (no fetch waiting or running,
+# politeness window passed) are evicted
+FETCH_HOST_STATE_MAX = int(os.environ.get("FETCH_HOST_STATE_MAX", "4096"))
+
+# Content types worth downloading for text extraction (checked from headers)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UnsupportedContentType(Exception):
+    """Raised before the body is downloaded when the response is not HTML."""
+
+
+class _LoopState:
+    """Client, global limiter and per-host limiters bound to one event loop."""
+
+    def __init__(self, client: httpx.AsyncClient, global_cap: int):
+        self.client = client
+        self.global_limit = asyncio.Semaphore(global_cap)
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.host_users: Dict[str, int] = {}
+        self.host_next_start: Dict[str, float] = {}
+        self.queued = 0
+        self.active = 0
+
+    def host_limit(self, host: str, cap: int) -> asyncio.Semaphore:
+        if host not in self.host_limits:
+            if len(self.host_limits) >= FETCH_HOST_STATE_MAX:
+                self.evict_idle_hosts()
+            self.host_limits[host] = asyncio.Semaphore(cap)
+        return self.host_limits[host]
+
+    def evict_idle_hosts(self):
+        """Drops the limiter and politeness slot of every host with no
+        fetch waiting or in flight whose spacing window has passed."""
+        now = time.monotonic()
+        idle = [h for h in self.host_limits
+                if not self.host_users.get(h) and self.host_next_start.get(h, 0.0) <= now]
+        for host in idle:
+            del self.host_limits[host]
+            self.host_next_start.pop(host, None)
+            self.host_users.pop(host, None)
+        perf_metrics.incr("fetch.hosts_evicted", len(idle))
+
+    def politeness_delay(self, host: str, interval: float) -> float:
+        """Reserves the next start slot for host; returns how long to wait."""
+        now = time.monotonic()
+        start = max(now, self.host_next_start.get(host, 0.0))
+        self.host_next_start[host] = start + interval
+        return start - now
+
+    @contextlib.asynccontextmanager
+    async def admit(self, host: str, per_host: int, interval: float):
+        """Waits for a per-host slot, the host's politeness spacing and a
+        global slot; time spent here is the fetch queue wait."""
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.host_users[host] = self.host_users.get(host, 0) + 1
+        admitted = False
+        try:
+            async with self.host_limit(host, per_host):
+                delay = self.politeness_delay(host, interval)
+                if delay > 0:
+                    perf_metrics.incr("fetch.politeness_waits")
+                    await asyncio.sleep(delay)
+                async with self.global_limit:
+                    self.queued -= 1
+                    self.active += 1
+                    admitted = True
+                    perf_metrics.observe("fetch.queue_wait", time.perf_counter() - queued_at)
+                    try:
+                        yield
+                    finally:
+                        self.active -= 1
+        finally:
+            self.host_users[host] -= 1
+            # Cancelled or failed while still waiting for a slot
+            if not admitted:
+                self.queued -= 1
+
+
+class PooledFetcher:
+    """
+    Process-wide HTTP fetcher with connection pooling and keep-alive.
+
+    httpx.AsyncClient is bound to the loop it was created on, so one
+    client is kept per event loop; creation is guarded by a lock so
+    worker threads running their own loops get their own pool safely.
+    """
+
+    def __init__(self,
+                 max_connections: int = FETCH_MAX_CONNECTIONS,
+                 max_keepalive: int = FETCH_MAX_KEEPALIVE,
+                 max_per_host: int = FETCH_MAX_PER_HOST,
+                 global_limit: int = FETCH_GLOBAL_LIMIT,
+                 host_interval: float = FETCH_HOST_INTERVAL,
+                 connect_timeout: float = FETCH_CONNECT_TIMEOUT,
+                 read_timeout: float = FETCH_READ_TIMEOUT,
+                 total_timeout: float = FETCH_TOTAL_TIMEOUT,
+                 http2: bool = FETCH_HTTP2):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.max_per_host = max_per_host
+        self.global_limit = global_limit
+        self.host_interval = host_interval
+        self.total_timeout = total_timeout
+        self.timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout,
+                                     write=read_timeout, pool=connect_timeout)
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            print("[WARNING] FETCH_HTTP2=1 but 'h2' is not installed; using HTTP/1.1.")
+
+        self._states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(
+                    headers=DEFAULT_HEADERS,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive,
+                        keepalive_expiry=FETCH_KEEPALIVE_EXPIRY,
+                    ),
+                    http2=self.http2,
+                    follow_redirects=True,
+                )
+                state = self._states[loop] = _LoopState(client, self.global_limit)
+            return state
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET with per-host cap, total timeout and per-fetch timing metrics."""
+        state = self._state()
+        host = urlparse(url).netloc
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        perf_metrics.incr("fetch.requests")
+        try:
+            async with state.admit(host, self.max_per_host, self.host_interval):
+                response = await asyncio.wait_for(
+                    state.client.get(url, headers=headers, extensions={"trace": self._tracer(timings)}),
+                    timeout=self.total_timeout,
+                )
+        except Exception:
+            perf_metrics.incr("fetch.errors")
+            raise
+        finally:
+            self._record(timings, start)
+
+        return response
+
+    async def stream_text(self, url: str, max_bytes: int,
+                          on_text: Callable[[str], Awaitable[bool]],
+                          allowed_types=HTML_CONTENT_TYPES,
+                          headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        Streams the body through on_text() as decoded text chunks.
+
+        The content type is checked from the headers before any body bytes
+        are read. Reading stops once max_bytes have arrived or on_text()
+        returns True; the remaining body is never downloaded. Returns the
+        (closed) response for its status and headers; a 304 reply to a
+        conditional request is returned without reading a body.
+        """
+        state = self._state()
+        host = urlparse(url).netloc
+        timings: Dict[str, float] = {}
+
+        async def consume() -> httpx.Response:
+            read = 0
+            async with state.client.stream("GET", url, headers=headers,
+                                           extensions={"trace": self._tracer(timings)}) as response:
+                if response.status_code == 304:
+                    return response
+                response.raise_for_status()
+
+                content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in allowed_types:
+                    perf_metrics.incr("fetch.rejected_content_type")
+                    raise UnsupportedContentType(f"Unsupported content type: {content_type}")
+
+                decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+                async for chunk in response.aiter_bytes():
+                    remaining = max_bytes - read
+                    chunk = chunk[:remaining]
+                    read += len(chunk)
+
+                    if await on_text(decoder.decode(chunk)):
+                        perf_metrics.incr("fetch.stopped_early")
+                        break
+                    if read >= max_bytes:
+                        perf_metrics.incr("fetch.byte_budget_hit")
+                        break
+                else:
+                    # Body ended: emit bytes the decoder held back (a
+                    # multi-byte character split by the last chunk)
+                    await on_text(decoder.decode(b"", final=True))
+
+            perf_metrics.incr("fetch.bytes_read", read)
+            return response
+
+        start = time.perf_counter()
+        perf_metrics.incr("fetch.requests")
+        try:
+            async with state.admit(host, self.max_per_host, self.host_interval):
+                return await asyncio.wait_for(consume(), timeout=self.total_timeout)
+        except Exception:
+            perf_metrics.incr("fetch.errors")
+            raise
+        finally:
+            self._record(timings, start)
+
+    @staticmethod
+    def _tracer(timings: Dict[str, float]):
+        async def trace(event_name: str, info: Dict[str, Any]):
+            # httpcore emits connection.connect_tcp.* / connection.start_tls.*
+            # only when a new connection is opened.
+            timings[event_name] = time.perf_counter()
+        return trace
+
+    @staticmethod
+    def _record(timings: Dict[str, float], start: float):
+        perf_metrics.observe("fetch.total", time.perf_counter() - start)
+
+        tcp_start = timings.get("connection.connect_tcp.started")
+        if tcp_start is None:
+            # Reused only if the request reached the server; fetches
+            # cancelled in the queue or failed before sending count apart
+            if any(e.endswith("receive_response_headers.complete") for e in timings):
+                perf_metrics.incr("fetch.connections_reused")
+            else:
+                perf_metrics.incr("fetch.connections_unused")
+            return
+
+        perf_metrics.incr("fetch.connections_new")
+        handshake_end = (timings.get("connection.start_tls.complete")
+                         or timings.get("connection.connect_tcp.complete"))
+        if handshake_end:
+            perf_metrics.observe("fetch.handshake", handshake_end - tcp_start)
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "max_per_host": self.max_per_host,
+            "global_limit": self.global_limit,
+            "host_interval": self.host_interval,
+            "timeouts": {
+                "connect": self.timeout.connect,
+                "read": self.timeout.read,
+                "total": self.total_timeout,
+            },
+            "http2": self.http2,
+            "max_bytes": FETCH_MAX_BYTES,
+        }
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Fetches waiting for a slot vs. in flight, summed over loops."""
+        with self._lock:
+            states = list(self._states.values())
+        return {
+            "queued": sum(s.queued for s in states),
+            "active": sum(s.active for s in states),
+        }
+
+    async def aclose(self):
+        """Close the client owned by the current loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.pop(loop, None)
+        if state:
+            await state.client.aclose()
+
+
+_fetcher: Optional[PooledFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> PooledFetcher:
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = PooledFetcher()
+        return _fetcher
@@ -0,0 +1,341 @@
+# ==================================================
+# TRINETRA LLM GATEWAY
+# Rate-limit aware scheduling for every Groq call
+# ==================================================
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+import groq
+
+import perf_metrics
+
+# Groq per-minute budgets for the account (free tier defaults for llama-3.1-8b-instant)
+GROQ_RPM = int(os.environ.get("GROQ_RPM", "30"))
+GROQ_TPM = int(os.environ.get("GROQ_TPM", "6000"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "8"))
+# Completion tokens assumed when the caller sets no max_tokens
+LLM_COMPLETION_ESTIMATE = int(os.environ.get("LLM_COMPLETION_ESTIMATE", "256"))
+# Longest a call waits for budget before failing with LLMBudgetExhausted (0 = no limit)
+LLM_MAX_QUEUE_WAIT = float(os.environ.get("LLM_MAX_QUEUE_WAIT", "20"))
+
+# Lower value = served first when the budget is short
+PRIORITY_GUARD = 0
+PRIORITY_ROUTER = 1
+PRIORITY_CONTENT = 2
+PRIORITY_NAMES = {PRIORITY_GUARD: "guard", PRIORITY_ROUTER: "router", PRIORITY_CONTENT: "content"}
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class LLMBudgetExhausted(Exception):
+    """Raised when a call has waited LLM_MAX_QUEUE_WAIT for RPM/TPM budget."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("LLM rate budget exhausted")
+        self.retry_after = retry_after
+
+
+def estimate_tokens(texts: List[str], max_tokens: Optional[int] = None) -> int:
+    """Rough prompt + completion size (~4 chars per token)."""
+    return sum(len(t) for t in texts) // 4 + (max_tokens or LLM_COMPLETION_ESTIMATE)
+
+
+def request_key(model: str, messages: List[Dict[str, str]]) -> str:
+    """Identity of a request for in-flight coalescing."""
+    payload = json.dumps([model, messages], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _actual_tokens(result) -> Optional[int]:
+    """Total tokens billed, from a LangChain AIMessage or a Groq completion."""
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    usage = getattr(result, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+class TokenBucket:
+    """Refills continuously at capacity per minute. Not locked; the gateway
+    holds its lock around every bucket operation."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+
+@dataclass
+class _Inflight:
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class _LoopState:
+    """Priority wait queue and in-flight requests bound to one event loop."""
+
+    def __init__(self):
+        self.waiters: List[tuple] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.inflight: Dict[str, _Inflight] = {}
+
+
+class LLMGateway:
+    """
+    Single admission point for Groq calls (content LLM, decision LLM, guard).
+
+    Every call reserves one request and its estimated tokens from the
+    RPM/TPM buckets; when the budget is short, waiters are admitted
+    strictly by priority (guard > router > content). 429/5xx and
+    connection errors are retried with full-jitter exponential backoff,
+    honouring Retry-After. Identical concurrent requests share one call.
+    A call that waits longer than max_queue_wait for budget raises
+    LLMBudgetExhausted (served as 503) instead of queueing indefinitely.
+    """
+
+    def __init__(self, rpm: int = GROQ_RPM, tpm: int = GROQ_TPM, max_retries: int = LLM_MAX_RETRIES,
+                 max_queue_wait: float = LLM_MAX_QUEUE_WAIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.max_queue_wait = max_queue_wait
+        self._seq = itertools.count()
+        self._states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._lock = threading.Lock()
+
+    # ---------- budget ----------
+
+    def _reserve(self, tokens: int) -> float:
+        """Takes the budget if available (returns 0), else the wait needed."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait <= 0:
+                self.requests.level -= 1
+                self.tokens.level -= min(tokens, self.tokens.capacity)
+            return wait
+
+    def _settle(self, estimated: int, result):
+        """Charges the difference between estimated and billed tokens."""
+        actual = _actual_tokens(result)
+        if actual is not None:
+            with self._lock:
+                self.tokens.level -= actual - estimated
+
+    def _exhausted(self, tokens: int) -> LLMBudgetExhausted:
+        perf_metrics.incr("llm.queue_timeouts")
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        return LLMBudgetExhausted(retry_after=max(1, math.ceil(wait)))
+
+    def _throttled(self):
+        """A 429 means our view of the budget is stale: pause everyone."""
+        with self._lock:
+            self.requests.level = min(self.requests.level, 0.0)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        status = getattr(error, "status_code", None)
+        if status not in RETRYABLE_STATUS and not isinstance(error, groq.APIConnectionError):
+            return None
+        if attempt >= self.max_retries:
+            return None
+
+        if status == 429:
+            perf_metrics.incr("llm.rate_limited")
+            self._throttled()
+
+        retry_after = 0.0
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", 0))
+            except ValueError:
+                pass
+        backoff = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+        return max(retry_after, random.uniform(0, backoff))
+
+    # ---------- async path ----------
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.get(loop)
+            if state is None:
+                state = self._states[loop] = _LoopState()
+            return state
+
+    def _pump(self, state: _LoopState):
+        """Admits waiters in priority order while the budget lasts."""
+        state.timer = None
+        while state.waiters:
+            _, _, tokens, future = state.waiters[0]
+            if future.done():
+                heapq.heappop(state.waiters)
+                continue
+            wait = self._reserve(tokens)
+            if wait > 0:
+                state.timer = asyncio.get_running_loop().call_later(wait, self._pump, state)
+                return
+            heapq.heappop(state.waiters)
+            future.set_result(None)
+
+    async def _acquire(self, priority: int, tokens: int):
+        state = self._state()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(state.waiters, (priority, next(self._seq), tokens, future))
+        if state.timer is None:
+            self._pump(state)
+        try:
+            # A timed-out waiter's future is cancelled; _pump skips it
+            await asyncio.wait_for(future, self.max_queue_wait or None)
+        except asyncio.TimeoutError:
+            raise self._exhausted(tokens) from None
+
+    async def _execute(self, priority: int, factory: Callable[[], Awaitable[Any]], tokens: int):
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.perf_counter()
+            await self._acquire(priority, tokens)
+            perf_metrics.observe(f"llm.queue_wait.{name}", time.perf_counter() - queued_at)
+            perf_metrics.incr(f"llm.requests.{name}")
+
+            started = time.perf_counter()
+            try:
+                result = await factory()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    perf_metrics.incr("llm.errors")
+                    raise
+                perf_metrics.incr("llm.retries")
+                await asyncio.sleep(delay)
+                continue
+
+            perf_metrics.observe(f"llm.call.{name}", time.perf_counter() - started)
+            self._settle(tokens, result)
+            return result
+
+    async def _join(self, entry: _Inflight):
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            # Every caller gave up (e.g. cancelled scan): stop spending on it
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+
+    async def acall(self, priority: int, factory: Callable[[], Awaitable[Any]],
+                    tokens: int, key: Optional[str] = None):
+        """Runs factory() under the budget; concurrent calls with the same
+        key share a single request and result."""
+        if key is None:
+            return await self._execute(priority, factory, tokens)
+
+        state = self._state()
+        entry = state.inflight.get(key)
+        if entry is not None:
+            perf_metrics.incr("llm.coalesced")
+        else:
+            entry = state.inflight[key] = _Inflight(asyncio.ensure_future(self._execute(priority, factory, tokens)))
+            entry.task.add_done_callback(lambda _: state.inflight.pop(key, None))
+        return await self._join(entry)
+
+    async def ainvoke(self, llm, messages: list, priority: int = PRIORITY_CONTENT):
+        """LangChain chat model call (ChatGroq.ainvoke) through the gateway."""
+        plain = [{"role": m.type, "content": m.content} for m in messages]
+        tokens = estimate_tokens([m["content"] for m in plain], getattr(llm, "max_tokens", None))
+        return await self.acall(priority, lambda: llm.ainvoke(messages), tokens,
+                                key=request_key(llm.model_name, plain))
+
+    # ---------- sync path ----------
+
+    def call(self, priority: int, fn: Callable[[], Any], tokens: int):
+        """Blocking variant for sync callers; shares the same budget but
+        is not ordered against async waiters."""
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.perf_counter()
+            while True:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    break
+                if self.max_queue_wait and time.perf_counter() - queued_at + wait > self.max_queue_wait:
+                    raise self._exhausted(tokens)
+                time.sleep(min(wait, 1.0))
+            perf_metrics.observe(f"llm.queue_wait.{name}", time.perf_counter() - queued_at)
+            perf_metrics.incr(f"llm.requests.{name}")
+
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    perf_metrics.incr("llm.errors")
+                    raise
+                perf_metrics.incr("llm.retries")
+                time.sleep(delay)
+                continue
+
+            self._settle(tokens, result)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            queued = sum(len(s.waiters) for s in self._states.values())
+            inflight = sum(len(s.inflight) for s in self._states.values())
+            budget = {"requests": round(self.requests.level, 2), "tokens": round(self.tokens.level)}
+        return {
+            "limits": {"rpm": int(self.requests.capacity), "tpm": int(self.tokens.capacity)},
+            "available": budget,
+            "queued": queued,
+            "coalescing": inflight,
+            "requests": {n: perf_metrics.get_counter(f"llm.requests.{n}") for n in PRIORITY_NAMES.values()},
+            "retries": perf_metrics.get_counter("llm.retries"),
+            "rate_limited": perf_metrics.get_counter("llm.rate_limited"),
+            "coalesced": perf_metrics.get_counter("llm.coalesced"),
+            "errors": perf_metrics.get_counter("llm.errors"),
+            "max_queue_wait": self.max_queue_wait,
+            "queue_timeouts": perf_metrics.get_counter("llm.queue_timeouts"),
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -0,0 +1,205 @@
+# ==================================================
+# TRINETRA LOCAL ROUTER
+# Fast-path routing for obvious prompts (no LLM call)
+# ==================================================
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import perf_metrics
+import storage
+
+LOCAL_ROUTER_ENABLED = os.environ.get("LOCAL_ROUTER_ENABLED", "1") == "1"
+# Resolve locally only when the model is this sure; otherwise escalate
+LOCAL_ROUTER_YES = float(os.environ.get("LOCAL_ROUTER_YES", "0.92"))
+LOCAL_ROUTER_NO = float(os.environ.get("LOCAL_ROUTER_NO", "0.08"))
+ROUTER_MIN_TRAINING = int(os.environ.get("ROUTER_MIN_TRAINING", "50"))
+ROUTER_RETRAIN_EVERY = int(os.environ.get("ROUTER_RETRAIN_EVERY", "100"))
+# How often the background refit checks for new decisions (seconds)
+ROUTER_REFIT_INTERVAL = float(os.environ.get("ROUTER_REFIT_INTERVAL", "30"))
+
+HASH_BUCKETS = 4096
+
+# Cue groups -> prior weight (log-odds of "needs external sources")
+CUE_PATTERNS = {
+    "temporal": (r"\b(today|tonight|yesterday|tomorrow|latest|current(ly)?|right now|this (week|month|year)"
+                 r"|recent(ly)?|live|breaking|as of|now)\b", 2.5),
+    "market_data": (r"\b(price|prices|rate|rates|stock|shares?|sensex|nifty|nasdaq|exchange rate|inflation"
+                    r"|gdp|bitcoin|crypto|forecast|weather|score|result|results|standings)\b", 1.5),
+    "news": (r"\b(news|headlines?|announced|announcement|election|released|launch(ed)?|update)\b", 2.0),
+    "greeting": (r"^\s*(hi|hello|hey|thanks|thank you|good (morning|evening|night)|how are you)\b", -4.5),
+    "conceptual": (r"\b(explain|define|definition|meaning of|how does|how do i|difference between"
+                   r"|teach me|what does .* mean|concept of|in simple terms|eli5)\b", -2.5),
+    "coding": (r"\b(code|function|python|javascript|algorithm|recursion|regex|sql|bug|compile|class)\b", -2.5),
+    "creative": (r"\b(write (a|an|me)|poem|story|essay|joke|lyrics|summarize this|rewrite|translate)\b", -3.0),
+    "assistant": (r"\b(who are you|your name|are you an? (ai|bot)|what can you do)\b", -4.0),
+}
+COMPILED_CUES = {name: (re.compile(p, re.IGNORECASE), w) for name, (p, w) in CUE_PATTERNS.items()}
+
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _hash(token: str) -> int:
+    # zlib.crc32 is stable across processes (str hash is salted)
+    return zlib.crc32(token.encode("utf-8")) % HASH_BUCKETS
+
+
+def extract_features(prompt: str) -> Tuple[Dict[str, float], List[int]]:
+    """Named cue features plus hashed unigram/bigram buckets."""
+    cues = {name: 1.0 for name, (rx, _) in COMPILED_CUES.items() if rx.search(prompt)}
+
+    this_year = datetime.now().year
+    years = [int(m.group()) for m in YEAR_RE.finditer(prompt)]
+    if any(y >= this_year - 1 for y in years):
+        cues["recent_year"] = 1.0
+    elif years:
+        cues["past_year"] = 1.0
+
+    tokens = TOKEN_RE.findall(prompt.lower())
+    grams = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+    return cues, sorted({_hash(g) for g in grams})
+
+
+class LocalRouter:
+    """
+    Logistic router over cue features and hashed n-grams.
+
+    Starts from hand-set cue priors, then is refit on routing decisions
+    the LLM router made (logged in trinetra.db). route() returns True/False
+    when confident and None to escalate to DECISION_LLM.
+
+    Training never runs on the request path: record() only logs and flags
+    a refit, which a background task picks up via refit_if_due().
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.cue_weights: Dict[str, float] = {name: w for name, (_, w) in CUE_PATTERNS.items()}
+        self.cue_weights.update({"recent_year": 2.0, "past_year": 0.5})
+        self.hash_weights = [0.0] * HASH_BUCKETS
+        self.bias = 0.0
+        self.trained_on = 0
+        self._since_training = 0
+        self._retrain_due = False
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    # ---------- storage ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = storage.connect(self.db_path)
+        if not self._schema_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS router_decisions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    prompt TEXT NOT NULL,
+                    needs_external INTEGER NOT NULL,
+                    timestamp TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def record(self, prompt: str, needs_external: bool):
+        """Logs an LLM routing decision as training data (blocking)."""
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO router_decisions (prompt, needs_external, timestamp) VALUES (?, ?, ?)
+            ''', (prompt[:2000], int(needs_external), datetime.now().isoformat()))
+            conn.commit()
+
+        with self._lock:
+            self._since_training += 1
+            if self._since_training >= ROUTER_RETRAIN_EVERY:
+                self._retrain_due = True
+
+    # ---------- model ----------
+
+    def probability(self, prompt: str) -> float:
+        cues, buckets = extract_features(prompt)
+        z = self.bias
+        z += sum(self.cue_weights.get(name, 0.0) * v for name, v in cues.items())
+        z += sum(self.hash_weights[b] for b in buckets)
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def train(self, samples: List[Tuple[str, bool]], epochs: int = 8, lr: float = 0.1, l2: float = 1e-4):
+        """SGD logistic regression, warm-started from the current weights."""
+        featurized = [(extract_features(p), 1.0 if y else 0.0) for p, y in samples]
+        cue_w = dict(self.cue_weights)
+        hash_w = list(self.hash_weights)
+        bias = self.bias
+
+        for _ in range(epochs):
+            for (cues, buckets), y in featurized:
+                z = bias + sum(cue_w.get(n, 0.0) * v for n, v in cues.items()) + sum(hash_w[b] for b in buckets)
+                err = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z)))) - y
+                bias -= lr * err
+                for n, v in cues.items():
+                    cue_w[n] = cue_w.get(n, 0.0) - lr * (err * v + l2 * cue_w.get(n, 0.0))
+                for b in buckets:
+                    hash_w[b] -= lr * (err + l2 * hash_w[b])
+
+        with self._lock:
+            self.cue_weights, self.hash_weights, self.bias = cue_w, hash_w, bias
+            self.trained_on = len(samples)
+
+    def train_from_log(self, limit: int = 20000):
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT prompt, needs_external FROM router_decisions ORDER BY id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+
+        if len(rows) >= ROUTER_MIN_TRAINING:
+            self.train([(p, bool(y)) for p, y in rows])
+            print(f"[ROUTER] Local router trained on {len(rows)} logged decisions")
+
+    def refit_if_due(self) -> bool:
+        """Retrains when record() has flagged enough new decisions (blocking;
+        run off the event loop). Decisions logged meanwhile count toward
+        the next refit."""
+        with self._lock:
+            if not self._retrain_due:
+                return False
+            self._retrain_due = False
+            self._since_training = 0
+        self.train_from_log()
+        return True
+
+    # ---------- routing ----------
+
+    def route(self, prompt: str) -> Optional[bool]:
+        """True/False when confident, None to escalate to the LLM router.
+        Until the startup fit finishes this uses the cue priors."""
+        p = self.probability(prompt)
+        if p >= LOCAL_ROUTER_YES:
+            perf_metrics.incr("router.local_yes")
+            return True
+        if p <= LOCAL_ROUTER_NO:
+            perf_metrics.incr("router.local_no")
+            return False
+        perf_metrics.incr("router.escalated")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        local = perf_metrics.get_counter("router.local_yes") + perf_metrics.get_counter("router.local_no")
+        escalated = perf_metrics.get_counter("router.escalated")
+        llm_latency = perf_metrics.recorder("router.llm").snapshot()
+        return {
+            "enabled": LOCAL_ROUTER_ENABLED,
+            "thresholds": {"yes": LOCAL_ROUTER_YES, "no": LOCAL_ROUTER_NO},
+            "trained_on": self.trained_on,
+            "retrain_due": self._retrain_due,
+            "resolved_locally": local,
+            "escalated": escalated,
+            "local_fraction": round(local / (local + escalated), 3) if local + escalated else 0.0,
+            # Each local decision skips one LLM router round-trip
+            "estimated_latency_saved_ms": round(local * llm_latency["mean_ms"], 1),
+        }
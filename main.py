@@ -1,27 +1,41 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-import requests
-from bs4 import BeautifulSoup
-import sqlite3
+import re
+import httpx
 import uuid
 from datetime import datetime
 import os
-import concurrent.futures
-from functools import lru_cache
+import time
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from ddgs import DDGS
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
 
+# Before the local imports: they read their settings from os.environ
+# when imported, so values set in .env must already be there
+load_dotenv()
+
+import perf_metrics
+from storage import get_database
+from llm_gateway import get_gateway, LLMBudgetExhausted, PRIORITY_ROUTER, PRIORITY_CONTENT
+from http_client import get_fetcher, FETCH_MAX_BYTES
+from text_extraction import extract_text, new_streaming_extractor
+from page_cache import PageCache, PAGE_CACHE_ENABLED
+from credibility_store import CredibilityStore, topic_family
+from local_router import LocalRouter, LOCAL_ROUTER_ENABLED, ROUTER_REFIT_INTERVAL
+from cpu_pool import get_cpu_pool, CPUPoolSaturated, CPU_POOL_ENABLED
+
 # FastAPI imports
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import uvicorn
 
-load_dotenv()
-
 # =====================================================
 # CONFIGURATION
 # =====================================================
@@ -35,8 +49,29 @@ if not GROQ_API_KEY:
 CONTENT_MODEL = "llama-3.1-8b-instant"
 DECISION_MODEL = "llama-3.1-8b-instant"
 MAX_RESULTS = 12
+# Per-scan share of the process-wide fetch limit (FETCH_GLOBAL_LIMIT)
 MAX_WORKERS = 6
+# One long-lived pool for all blocking work (DDGS, SQLite, parsing)
+BLOCKING_WORKERS = int(os.environ.get("BLOCKING_WORKERS", "16"))
+# combined: router + topic domains in one LLM call | speculative: router,
+# topic domains and search in parallel | sequential: original two-step flow
+QUERY_PLANNER = os.environ.get("QUERY_PLANNER", "combined").lower()
+# One LLM call for all unresolved domains of a scan instead of one per URL
+CREDIBILITY_BATCH = os.environ.get("CREDIBILITY_BATCH", "1") == "1"
+# Quiet period (s) after the last keystroke before /detect/stream evaluates
+DETECT_STREAM_DEBOUNCE = float(os.environ.get("DETECT_STREAM_DEBOUNCE", "0.3"))
+# Stream page bodies and stop at FETCH_MAX_BYTES / max_chars of visible text
+FETCH_STREAMING = os.environ.get("FETCH_STREAMING", "1") == "1"
 DB_PATH = "trinetra.db"
+# Per-thread pooled WAL connections (storage.py); never closed per call
+DB = get_database(DB_PATH)
+
+# Extracted page text cache (table page_cache in DB_PATH)
+PAGE_CACHE = PageCache(DB_PATH)
+# LLM credibility verdicts per (domain, topic family) in DB_PATH
+CREDIBILITY_STORE = CredibilityStore(DB_PATH)
+# Local fast-path router, trained on logged LLM routing decisions
+LOCAL_ROUTER = LocalRouter(DB_PATH)
 
 BASELINE_TRUSTED = (
     ".gov", ".edu", "arxiv.org", "ieee.org", "acm.org",
@@ -55,6 +90,7 @@ LLM = ChatGroq(
     temperature=0,
     api_key=GROQ_API_KEY,
     timeout=30,
+    max_retries=0,  # retried by the LLM gateway
 )
 
 DECISION_LLM = ChatGroq(
@@ -62,6 +98,7 @@ DECISION_LLM = ChatGroq(
     temperature=0,
     api_key=GROQ_API_KEY,
     timeout=15,
+    max_retries=0,
 )
 
 
@@ -69,34 +106,36 @@ DECISION_LLM = ChatGroq(
 # DATABASE
 # =====================================================
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS scans (
-            scan_id TEXT PRIMARY KEY,
-            timestamp TEXT NOT NULL,
-            input_value TEXT NOT NULL,
-            input_type TEXT DEFAULT 'text',
-            status TEXT DEFAULT 'completed',
-            verdict TEXT NOT NULL,
-            confidence REAL DEFAULT 0.95,
-            reason TEXT,
-            analysis TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS url_classifications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            scan_id TEXT NOT NULL,
-            url TEXT NOT NULL,
-            domain TEXT,
-            status TEXT NOT NULL,
-            reason TEXT,
-            timestamp TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with DB.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scans (
+                scan_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                input_value TEXT NOT NULL,
+                input_type TEXT DEFAULT 'text',
+                status TEXT DEFAULT 'completed',
+                verdict TEXT NOT NULL,
+                confidence REAL DEFAULT 0.95,
+                reason TEXT,
+                analysis TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS url_classifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                domain TEXT,
+                status TEXT NOT NULL,
+                reason TEXT,
+                timestamp TEXT NOT NULL
+            )
+        ''')
+        # /logs and /scan/urls read newest first
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_url_classifications_timestamp "
+                       "ON url_classifications(timestamp)")
 
 
 def classify_verdict(analysis: str, input_value: str) -> Tuple[str, float, str]:
@@ -114,27 +153,28 @@ def classify_verdict(analysis: str, input_value: str) -> Tuple[str, float, str]:
     return ("SAFE", 0.97, "No threats detected")
 
 
+# Module-level SQL: identical text hits each connection's statement cache
+INSERT_SCAN_SQL = '''
+    INSERT INTO scans (scan_id, timestamp, input_value, verdict, confidence, reason, analysis)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_URL_CLASSIFICATION_SQL = '''
+    INSERT INTO url_classifications (scan_id, url, domain, status, reason, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
 def save_scan_record(scan_id: str, input_value: str, verdict: str,
                      confidence: float, reason: str, analysis: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO scans (scan_id, timestamp, input_value, verdict, confidence, reason, analysis)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (scan_id, datetime.now().isoformat(), input_value, verdict, confidence, reason, analysis))
-    conn.commit()
-    conn.close()
+    with DB.connection() as conn:
+        conn.execute(INSERT_SCAN_SQL, (scan_id, datetime.now().isoformat(), input_value,
+                                       verdict, confidence, reason, analysis))
 
 
 def save_url_classification(scan_id: str, url: str, domain: str, status: str, reason: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO url_classifications (scan_id, url, domain, status, reason, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (scan_id, url, domain, status, reason, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    with DB.connection() as conn:
+        conn.execute(INSERT_URL_CLASSIFICATION_SQL,
+                     (scan_id, url, domain, status, reason, datetime.now().isoformat()))
 
 
 # =====================================================
@@ -147,19 +187,49 @@ def extract_domain(url: str) -> str:
         return ""
 
 
-def fetch_page_content(url: str, max_chars: int = 2000) -> str:
-    """Optimized: Reduced timeout and content size for faster fetching"""
-    try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
+async def fetch_page_content_streaming(url: str, max_chars: int = 2000,
+                                      headers: dict = None) -> Tuple[str, httpx.Response]:
+    """Byte-capped streaming fetch: non-HTML is rejected from headers,
+    and the download stops once max_chars of visible text are collected"""
+    extractor = new_streaming_extractor(max_chars)
+
+    async def on_text(chunk: str) -> bool:
+        return await asyncio.to_thread(extractor.feed_chunk, chunk)
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
-            tag.decompose()
+    response = await get_fetcher().stream_text(url, FETCH_MAX_BYTES, on_text, headers=headers)
+    return extractor.text(), response
 
-        text = soup.get_text(separator=" ", strip=True)
-        return text[:max_chars]
+
+async def fetch_page_content(url: str, max_chars: int = 2000) -> str:
+    """Optimized: Reduced timeout and content size for faster fetching"""
+    try:
+        cached = None
+        if PAGE_CACHE_ENABLED:
+            cached = await asyncio.to_thread(PAGE_CACHE.lookup, url, max_chars)
+            if cached and cached.fresh:
+                return cached.content
+
+        # Stale entries are revalidated with If-None-Match / If-Modified-Since
+        validators = cached.validators() if cached else None
+
+        if FETCH_STREAMING:
+            content, response = await fetch_page_content_streaming(url, max_chars, validators)
+        else:
+            # Shared keep-alive pool: repeat hosts skip the TCP+TLS handshake
+            response = await get_fetcher().get(url, headers=validators)
+            if response.status_code != 304:
+                response.raise_for_status()
+                content = await get_cpu_pool().run(extract_text, response.text, max_chars)
+
+        domain = extract_domain(url)
+        if response.status_code == 304 and cached:
+            await asyncio.to_thread(PAGE_CACHE.revalidated, url, domain)
+            return cached.content
+
+        if PAGE_CACHE_ENABLED:
+            await asyncio.to_thread(PAGE_CACHE.store, url, domain, content, max_chars,
+                                    response.headers.get("etag"), response.headers.get("last-modified"))
+        return content
     except Exception as e:
         return f"[Failed to fetch: {e}]"
 
@@ -167,7 +237,7 @@ def fetch_page_content(url: str, max_chars: int = 2000) -> str:
 # =====================================================
 # DECISION AGENT
 # =====================================================
-def needs_external_sources(prompt: str) -> bool:
+async def needs_external_sources(prompt: str) -> bool:
     decision_prompt = f"""
 You are a routing agent.
 
@@ -190,18 +260,106 @@ Prompt: {prompt}
 Respond ONLY with YES or NO.
 """
 
-    response = DECISION_LLM.invoke([
+    response = await get_gateway().ainvoke(DECISION_LLM, [
         SystemMessage(content="Respond ONLY with YES or NO."),
         HumanMessage(content=decision_prompt)
-    ])
+    ], PRIORITY_ROUTER)
 
     return response.content.strip().upper() == "YES"
 
 
+PLANNER_ROUTE_RE = re.compile(r"EXTERNAL:\s*(YES|NO)\b", re.IGNORECASE)
+
+
+async def plan_query(prompt: str) -> Tuple[bool, List[str] | None]:
+    """Routing decision and topic domain list in ONE LLM round-trip;
+    domains are None when discovery should look them up itself"""
+    planner_prompt = f"""
+You are a routing and research-planning agent.
+
+STEP 1 - Classify the user's prompt.
+
+Answer YES only if the prompt requires:
+- Current events
+- Recent news
+- Specific real-world data
+- External factual verification
+
+Answer NO if the prompt is:
+- About yourself or the assistant
+- Conversational or opinion-based
+- Conceptual or explanatory
+- General knowledge
+
+STEP 2 - Only if the answer is YES, list 5-10 authoritative domain names relevant to the prompt:
+- Include PRIMARY data sources (official exchanges, councils, government)
+- Industry-leading news/data providers
+- One domain per line
+
+Prompt: {prompt}
+
+Respond EXACTLY in this format:
+EXTERNAL: YES or NO
+DOMAINS:
+<one domain per line, empty if NO>
+"""
+
+    response = await get_gateway().ainvoke(DECISION_LLM, [
+        SystemMessage(content="Strict format required."),
+        HumanMessage(content=planner_prompt)
+    ], PRIORITY_ROUTER)
+
+    match = PLANNER_ROUTE_RE.search(response.content)
+    if not match:
+        # Unparseable plan: fall back to the dedicated router, and let
+        # discovery run the normal topic-domain lookup
+        perf_metrics.incr("planner.fallbacks")
+        return await needs_external_sources(prompt), None
+
+    needs_sources = match.group(1).upper() == "YES"
+    domains_block = response.content.split("DOMAINS:", 1)[-1] if "DOMAINS:" in response.content else ""
+    if not needs_sources:
+        return False, []
+    # A YES plan without domains also leaves the lookup to discovery
+    return True, parse_domain_lines(domains_block) or None
+
+
+async def speculative_result(task: asyncio.Task, what: str) -> List[str]:
+    """A failed speculative task degrades like discover(): no topic
+    domains (baseline and credibility checks only) or no candidate URLs"""
+    try:
+        return await task
+    except Exception as e:
+        perf_metrics.incr("planner.speculation_failed")
+        print(f"   ⚠️ Speculative {what} failed: {e}")
+        return []
+
+
+async def plan_speculatively(prompt: str) -> Tuple[bool, List[str] | None, List[str] | None]:
+    """Router, topic-domain LLM and DDGS search in parallel; the
+    speculative work is cancelled if the router says NO"""
+    route = asyncio.create_task(needs_external_sources(prompt))
+    domains = asyncio.create_task(get_topic_trusted_domains(prompt))
+    search = asyncio.create_task(asyncio.to_thread(search_candidate_urls, prompt))
+
+    try:
+        if not await route:
+            perf_metrics.incr("planner.speculation_wasted")
+            domains.cancel()
+            search.cancel()
+            return False, None, None
+        topic_domains = await speculative_result(domains, "topic-domain lookup")
+        return True, topic_domains, await speculative_result(search, "search")
+    except BaseException:
+        domains.cancel()
+        search.cancel()
+        raise
+
+
 # =====================================================
 # URL FETCHER AGENT
 # =====================================================
-def get_topic_trusted_domains(topic: str) -> List[str]:
+async def get_topic_trusted_domains(topic: str) -> List[str]:
     prompt = f"""
 You are a research librarian.
 
@@ -215,14 +373,22 @@ Rules:
 - No explanations
 """
 
-    response = LLM.invoke([
+    response = await get_gateway().ainvoke(LLM, [
         SystemMessage(content="Return only domain names."),
         HumanMessage(content=prompt)
-    ])
+    ], PRIORITY_ROUTER)
+
+    return parse_domain_lines(response.content)
+
 
+LIST_MARKER_RE = re.compile(r"^(?:[-*•]|\d+[.)])\s*")
+
+
+def parse_domain_lines(text: str) -> List[str]:
+    lines = (LIST_MARKER_RE.sub("", line.strip()) for line in text.split("\n"))
     return [
-        line.strip().lower()
-        for line in response.content.split("\n")
+        line.lower()
+        for line in lines
         if "." in line and " " not in line
     ]
 
@@ -239,7 +405,13 @@ def is_topic_trusted(url: str, topic_domains: List[str]) -> bool:
     return any(td in domain or domain in td for td in topic_domains)
 
 
-def llm_credibility_score(url: str, topic: str, topic_domains: List[str]) -> Tuple[bool, str]:
+CREDIBILITY_LINE_RE = re.compile(
+    r"DOMAIN:\s*(\S+)\s*\|\s*VERDICT:\s*(YES|NO)\b[^|]*\|\s*REASON:\s*(.*)",
+    re.IGNORECASE,
+)
+
+
+async def llm_credibility_score(url: str, topic: str, topic_domains: List[str]) -> Tuple[bool, str]:
     domain = extract_domain(url)
 
     prompt = f"""
@@ -263,10 +435,10 @@ VERDICT: YES or NO
 REASON: One sentence
 """
 
-    response = LLM.invoke([
+    response = await get_gateway().ainvoke(LLM, [
         SystemMessage(content="Strict format required."),
         HumanMessage(content=prompt)
-    ])
+    ], PRIORITY_CONTENT)
 
     text = response.content.upper()
     is_credible = "VERDICT: YES" in text
@@ -275,39 +447,114 @@ REASON: One sentence
     return is_credible, reason
 
 
-@lru_cache(maxsize=500)
-def cached_credibility_check(domain: str, topic: str, topic_domains_tuple: tuple) -> Tuple[bool, str]:
-    """Cache LLM credibility results to avoid repeated calls"""
-    return llm_credibility_score(f"https://{domain}", topic, list(topic_domains_tuple))
+async def llm_credibility_batch(domains: List[str], topic: str, topic_domains: List[str]) -> Dict[str, Tuple[bool, str]]:
+    """One LLM round-trip for every unresolved domain of a scan.
+    Domains without a parseable verdict line are left out of the result."""
+    domain_list = "\n".join(f"{i}. {d}" for i, d in enumerate(domains, 1))
 
+    prompt = f"""
+Evaluate whether EACH domain below is a PRIMARY or AUTHORITATIVE source for the topic.
 
-def fetch_and_validate(url: str, topic: str, topic_domains: List[str], scan_id: str) -> Tuple[str, str, str, str] | None:
-    """Fetch content and validate in one step - runs in parallel"""
-    domain = extract_domain(url)
+Topic: {topic}
 
-    # Check baseline/topic trust first (fast)
-    if is_baseline_trusted(url):
-        tag, reason = "BASELINE", "Baseline trusted source"
-    elif is_topic_trusted(url, topic_domains):
-        tag, reason = "TOPIC_MATCH", "Topic-relevant trusted source"
+Domains:
+{domain_list}
+
+A source is credible if it is:
+- Official exchange or regulatory body
+- Major financial news outlet
+- Industry association or council
+- Government data source
+
+Known trusted domains for this topic:
+{', '.join(topic_domains)}
+
+Respond with EXACTLY one line per domain, in the same order, in this format:
+DOMAIN: <domain> | VERDICT: YES or NO | REASON: One sentence
+"""
+
+    response = await get_gateway().ainvoke(LLM, [
+        SystemMessage(content="Strict format required. One line per domain."),
+        HumanMessage(content=prompt)
+    ], PRIORITY_CONTENT)
+    perf_metrics.incr("credibility.llm_calls")
+    perf_metrics.incr("credibility.batched_domains", len(domains))
+
+    wanted = set(domains)
+    verdicts = {}
+    for match in CREDIBILITY_LINE_RE.finditer(response.content):
+        domain = match.group(1).strip().lower().rstrip(".").replace("www.", "")
+        if domain in wanted and domain not in verdicts:
+            verdicts[domain] = (match.group(2).upper() == "YES", match.group(3).strip())
+    return verdicts
+
+
+async def credibility_verdicts(domains: List[str], topic: str, topic_domains: List[str]) -> Dict[str, Tuple[bool, str]]:
+    """Verdicts for all unresolved domains: durable store first, then one
+    batched LLM call (or one call per domain with CREDIBILITY_BATCH=0)"""
+    family = topic_family(topic)
+    verdicts = await asyncio.to_thread(CREDIBILITY_STORE.get_many, domains, family)
+    missing = [d for d in domains if d not in verdicts]
+    if not missing:
+        return verdicts
+
+    if CREDIBILITY_BATCH:
+        fresh = await llm_credibility_batch(missing, topic, topic_domains)
     else:
-        ok, llm_reason = cached_credibility_check(domain, topic, tuple(topic_domains))
-        if not ok:
-            return None
-        tag, reason = "LLM_APPROVED", llm_reason
+        results = await asyncio.gather(
+            *(llm_credibility_score(f"https://{d}", topic, topic_domains) for d in missing)
+        )
+        perf_metrics.incr("credibility.llm_calls", len(missing))
+        fresh = dict(zip(missing, results))
+
+    for domain, (ok, reason) in fresh.items():
+        await asyncio.to_thread(CREDIBILITY_STORE.put, domain, family, ok, reason)
 
-    content = fetch_page_content(url)
+    verdicts.update(fresh)
+    return verdicts
+
+
+def trust_tag(url: str, topic_domains: List[str]) -> Tuple[str, str] | None:
+    """Fast allow-list checks that need no LLM verdict"""
+    if is_baseline_trusted(url):
+        return "BASELINE", "Baseline trusted source"
+    if is_topic_trusted(url, topic_domains):
+        return "TOPIC_MATCH", "Topic-relevant trusted source"
+    return None
+
+
+async def select_credible_candidates(urls: List[str], topic: str, topic_domains: List[str]) -> List[Tuple[str, str, str]]:
+    """(url, tag, reason) for every URL worth fetching, in search order"""
+    tags = {url: trust_tag(url, topic_domains) for url in urls}
+    unresolved = list(dict.fromkeys(extract_domain(u) for u, tag in tags.items() if tag is None))
+    verdicts = await credibility_verdicts(unresolved, topic, topic_domains) if unresolved else {}
+
+    approved = []
+    for url in urls:
+        if tags[url]:
+            approved.append((url, *tags[url]))
+            continue
+        ok, reason = verdicts.get(extract_domain(url), (False, "No verdict returned"))
+        if ok:
+            approved.append((url, "LLM_APPROVED", reason))
+    return approved
+
+
+async def fetch_source(url: str, tag: str, reason: str) -> Tuple[str, str, str, str] | None:
+    """Fetch an approved source - runs concurrently"""
+    content = await fetch_page_content(url)
     if content.startswith("[Failed"):
         return None
 
     return (url, content, tag, reason)
 
 
-def get_credible_sources(prompt: str, scan_id: str = None) -> List[Tuple[str, str]]:
-    """Optimized with parallel URL fetching and validation"""
-    topic_domains = get_topic_trusted_domains(prompt)
-    print(f"📋 Topic domains: {', '.join(topic_domains[:5])}...")
+# Queue sentinel: discovery has scheduled every fetch it is going to
+DISCOVERY_DONE = object()
+
 
+def search_candidate_urls(prompt: str) -> List[str]:
+    """Blocking DDGS search - called via asyncio.to_thread"""
     urls = []
     with DDGS() as ddgs:
         results = ddgs.text(prompt, max_results=MAX_RESULTS)
@@ -316,49 +563,120 @@ def get_credible_sources(prompt: str, scan_id: str = None) -> List[Tuple[str, st
             if url:
                 urls.append(url)
 
-    urls = list(dict.fromkeys(urls))
-    print(f"🌐 Found {len(urls)} candidate URLs")
-
+    return list(dict.fromkeys(urls))
+
+
+async def get_credible_sources(prompt: str, scan_id: str = None,
+                               topic_domains: List[str] = None, urls: List[str] = None,
+                               started_at: float = None) -> List[Tuple[str, str]]:
+    """Pipelined source discovery: search, topic-domain generation and page
+    fetches overlap. topic_domains / urls may be supplied by the query planner."""
+    started_at = started_at or time.perf_counter()
+    limiter = asyncio.Semaphore(MAX_WORKERS)
+    results: asyncio.Queue = asyncio.Queue()
+    scheduled = set()
+    fetch_tasks = []
+
+    async def bounded_fetch(url: str, tag: str, reason: str):
+        try:
+            async with limiter:
+                result = await fetch_source(url, tag, reason)
+        except Exception as e:
+            print(f"   ⚠️ Error processing URL: {e}")
+            result = None
+        results.put_nowait(result)
+
+    def schedule(url: str, tag: str, reason: str):
+        if url not in scheduled:
+            scheduled.add(url)
+            fetch_tasks.append(asyncio.create_task(bounded_fetch(url, tag, reason)))
+
+    async def discover():
+        """Feeds fetches as soon as each URL is cleared; the LLM domain list
+        and credibility verdicts only gate URLs that actually need them"""
+        try:
+            domains_task = None
+            if topic_domains is None:
+                domains_task = asyncio.create_task(get_topic_trusted_domains(prompt))
+
+            candidate_urls = urls
+            if candidate_urls is None:
+                candidate_urls = await asyncio.to_thread(search_candidate_urls, prompt)
+            print(f"🌐 Found {len(candidate_urls)} candidate URLs")
+
+            # Baseline-trusted URLs start downloading while the domain list is generated
+            for url in candidate_urls:
+                if is_baseline_trusted(url):
+                    schedule(url, "BASELINE", "Baseline trusted source")
+
+            domains = topic_domains if domains_task is None else await domains_task
+            print(f"📋 Topic domains: {', '.join(domains[:5])}...")
+
+            for url in candidate_urls:
+                if is_topic_trusted(url, domains):
+                    schedule(url, "TOPIC_MATCH", "Topic-relevant trusted source")
+
+            remaining = [u for u in candidate_urls if u not in scheduled]
+            if remaining:
+                for candidate in await select_credible_candidates(remaining, prompt, domains):
+                    schedule(*candidate)
+            print(f"🔎 {len(scheduled)} URLs approved for fetching")
+        except Exception as e:
+            print(f"   ⚠️ Source discovery failed: {e}")
+        finally:
+            results.put_nowait(DISCOVERY_DONE)
+
+    discovery = asyncio.create_task(discover())
     credible = []
+    discovery_done = False
+    received = 0
 
-    # Parallel processing for faster execution
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(fetch_and_validate, url, prompt, topic_domains, scan_id): url
-            for url in urls
-        }
-
-        for future in concurrent.futures.as_completed(futures):
-            if len(credible) >= 5:
+    try:
+        while len(credible) < 5:
+            if discovery_done and received == len(fetch_tasks):
                 break
-            try:
-                result = future.result()
-                if result:
-                    url, content, tag, reason = result
-                    domain = extract_domain(url)
-                    print(f"   ✅ [{tag}] {domain}")
-                    if scan_id:
-                        save_url_classification(scan_id, url, domain, "safe", reason)
-                    credible.append((url, content))
-            except Exception as e:
-                print(f"   ⚠️ Error processing URL: {e}")
+            result = await results.get()
+            if result is DISCOVERY_DONE:
+                discovery_done = True
+                continue
+            received += 1
+            if not result:
                 continue
 
+            url, content, tag, reason = result
+            domain = extract_domain(url)
+            print(f"   ✅ [{tag}] {domain}")
+            if scan_id:
+                await asyncio.to_thread(save_url_classification, scan_id, url, domain, "safe", reason)
+            if not credible:
+                perf_metrics.observe("sources.time_to_first", time.perf_counter() - started_at)
+            credible.append((url, content))
+    finally:
+        # Quota met (or the scan was cancelled): abort discovery (no more
+        # credibility LLM calls) and every in-flight download instead of
+        # waiting on the slowest URL or leaving them orphaned
+        pending = [t for t in (discovery, *fetch_tasks) if not t.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        perf_metrics.incr("sources.cancelled_tasks", len(pending))
+    perf_metrics.observe("sources.total", time.perf_counter() - started_at)
+
     return credible[:5]
 
 
 # =====================================================
 # OUTPUT AGENT
 # =====================================================
-def output_llm_direct(prompt: str) -> str:
-    response = LLM.invoke([
+async def output_llm_direct(prompt: str) -> str:
+    response = await get_gateway().ainvoke(LLM, [
         SystemMessage(content="Answer clearly and concisely."),
         HumanMessage(content=prompt)
-    ])
+    ], PRIORITY_CONTENT)
     return response.content
 
 
-def output_llm_with_sources(prompt: str, sources: List[Tuple[str, str]]) -> str:
+async def output_llm_with_sources(prompt: str, sources: List[Tuple[str, str]]) -> str:
     source_text = "\n\n".join([
         f"Source: {url}\nContent: {content}"
         for url, content in sources
@@ -380,10 +698,10 @@ Sources:
 Question: {prompt}
 """
 
-    response = LLM.invoke([
+    response = await get_gateway().ainvoke(LLM, [
         SystemMessage(content="Use only the provided source content. Do not make up data."),
         HumanMessage(content=grounded_prompt)
-    ])
+    ], PRIORITY_CONTENT)
 
     return response.content
 
@@ -391,8 +709,9 @@ Question: {prompt}
 # =====================================================
 # ORCHESTRATOR
 # =====================================================
-def orchestrate(prompt: str, scan_id: str = None, restricted_mode: bool = False) -> str:
+async def orchestrate(prompt: str, scan_id: str = None, restricted_mode: bool = False) -> str:
     print("\n🧠 Decision Agent running...")
+    user_prompt = prompt
 
     if restricted_mode:
         print("⚠️ RESTRICTED MODE: Input treated as data only")
@@ -406,24 +725,49 @@ DATA:
 {prompt}
 """
 
-    if needs_external_sources(prompt):
+    started = time.perf_counter()
+    topic_domains = urls = None
+
+    # Obvious prompts are routed locally; only uncertain ones reach the LLM
+    needs_sources = None
+    if LOCAL_ROUTER_ENABLED:
+        needs_sources = await asyncio.to_thread(LOCAL_ROUTER.route, user_prompt)
+        if needs_sources is not None:
+            print(f"⚡ Routed locally: {'YES' if needs_sources else 'NO'}")
+
+    if needs_sources is None:
+        if QUERY_PLANNER == "combined":
+            needs_sources, topic_domains = await plan_query(prompt)
+        elif QUERY_PLANNER == "speculative":
+            needs_sources, topic_domains, urls = await plan_speculatively(prompt)
+        else:
+            needs_sources = await needs_external_sources(prompt)
+        perf_metrics.observe("router.llm", time.perf_counter() - started)
+        await asyncio.to_thread(LOCAL_ROUTER.record, user_prompt, needs_sources)
+    perf_metrics.observe("scan.plan", time.perf_counter() - started)
+
+    if needs_sources:
         print("🌐 External sources required")
-        sources = get_credible_sources(prompt, scan_id)
+        sources = await get_credible_sources(prompt, scan_id, topic_domains=topic_domains,
+                                             urls=urls, started_at=started)
 
         if not sources:
             return "No credible external sources found."
 
         print(f"\n📚 Using {len(sources)} credible sources")
-        return output_llm_with_sources(prompt, sources)
+        return await output_llm_with_sources(prompt, sources)
     else:
         print("🧠 No external sources required")
-        return output_llm_direct(prompt)
+        return await output_llm_direct(prompt)
 
 
 # =====================================================
 # PROMPT INJECTION GUARD
 # =====================================================
-from prompt_injection_guard import realtime_detect, final_decision
+from prompt_injection_guard import (REALTIME_SESSIONS, REALTIME_LLM_INTERVAL, RealtimeSession,
+                                    afinal_decision, cascade_stats, warm_ml_tier)
+from groq_injection_guard import VERDICT_CACHE
+from verdict_token import issue_verdict_token, verify_verdict_token
 
 
 # =====================================================
@@ -440,8 +784,102 @@ app.add_middleware(
 )
 
 
+class BlockingExecutor(ThreadPoolExecutor):
+    """Thread pool that counts submitted calls waiting for a thread and
+    running, for /metrics/performance."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._depth_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        def counted():
+            with self._depth_lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._depth_lock:
+                    self.running -= 1
+
+        with self._depth_lock:
+            self.queued += 1
+        try:
+            future = super().submit(counted)
+        except BaseException:
+            with self._depth_lock:
+                self.queued -= 1
+            raise
+        # Cancelled before a thread picked it up: it will never run
+        future.add_done_callback(self._forget_cancelled)
+        return future
+
+    def _forget_cancelled(self, future):
+        if future.cancelled():
+            with self._depth_lock:
+                self.queued -= 1
+
+
+BLOCKING_EXECUTOR = BlockingExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="trinetra")
+
+
+@app.on_event("startup")
+async def install_blocking_pool():
+    # asyncio.to_thread runs on the loop's default executor
+    asyncio.get_running_loop().set_default_executor(BLOCKING_EXECUTOR)
+
+
+@app.on_event("startup")
+async def warm_guard_model():
+    # With the CPU pool on, every worker loads the model (CPU_POOL_PRELOAD)
+    await asyncio.to_thread(get_cpu_pool().start if CPU_POOL_ENABLED else warm_ml_tier)
+
+
+async def refit_local_router():
+    # Fits on the logged decisions at startup, then whenever record() has
+    # flagged enough new ones; route() and record() never train inline
+    await asyncio.to_thread(LOCAL_ROUTER.train_from_log)
+    while True:
+        await asyncio.sleep(ROUTER_REFIT_INTERVAL)
+        try:
+            await asyncio.to_thread(LOCAL_ROUTER.refit_if_due)
+        except Exception as e:
+            print(f"[WARNING] Local router refit failed: {e}")
+
+
+ROUTER_REFIT_TASK: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_router_refit():
+    global ROUTER_REFIT_TASK
+    if LOCAL_ROUTER_ENABLED:
+        ROUTER_REFIT_TASK = asyncio.create_task(refit_local_router())
+
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    if ROUTER_REFIT_TASK is not None:
+        ROUTER_REFIT_TASK.cancel()
+    await get_fetcher().aclose()
+    get_cpu_pool().shutdown()
+
+
+@app.exception_handler(CPUPoolSaturated)
+@app.exception_handler(LLMBudgetExhausted)
+async def shed_load(request: Request, exc: CPUPoolSaturated | LLMBudgetExhausted):
+    # Shed load instead of queueing: the client retries after the backlog drains
+    return JSONResponse(status_code=503, content={"detail": str(exc), "retry_after": exc.retry_after},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+
 class ScanRequest(BaseModel):
     payload: str
+    # Signed /detect verdict for this exact payload; skips re-scoring
+    verdict_token: Optional[str] = None
 
 
 class DetectRequest(BaseModel):
@@ -461,12 +899,16 @@ async def run_scan(request: ScanRequest):
             }
 
         scan_id = str(uuid.uuid4())
-        result = final_decision(user_input)
+        result = None
+        if request.verdict_token:
+            result = verify_verdict_token(request.verdict_token, user_input)
+        if result is None:
+            result = await afinal_decision(user_input)
         print(f"🛡️ Security Check: {result.get('decision')} - {result.get('reason', 'N/A')}")
 
         if result["status"] == "BLOCKED":
-            save_scan_record(scan_id, user_input, "THREAT", 0.99,
-                             "Prompt Injection Blocked", result["reason"])
+            await asyncio.to_thread(save_scan_record, scan_id, user_input, "THREAT", 0.99,
+                                    "Prompt Injection Blocked", result["reason"])
             return {
                 "alert": "🚫 Prompt Injection Detected",
                 "status": "BLOCKED", "decision": result["decision"],
@@ -476,9 +918,9 @@ async def run_scan(request: ScanRequest):
             }
 
         restricted_mode = (result["decision"] == "ALLOW_WITH_WARNING")
-        explanation = orchestrate(user_input, scan_id, restricted_mode=restricted_mode)
+        explanation = await orchestrate(user_input, scan_id, restricted_mode=restricted_mode)
         verdict, confidence, reason = classify_verdict(explanation, user_input)
-        save_scan_record(scan_id, user_input, verdict, confidence, reason, explanation)
+        await asyncio.to_thread(save_scan_record, scan_id, user_input, verdict, confidence, reason, explanation)
 
         return {
             "alert": "⚠️ Suspicious intent detected" if restricted_mode else None,
@@ -489,6 +931,8 @@ async def run_scan(request: ScanRequest):
             "matched_patterns": result.get("matched_patterns", []) if restricted_mode else []
         }
 
+    except (CPUPoolSaturated, LLMBudgetExhausted):
+        raise
     except Exception as e:
         print(f"❌ Error: {e}")
         return {
@@ -498,41 +942,126 @@ async def run_scan(request: ScanRequest):
         }
 
 
-@app.post("/detect")
-async def detect_prompt(request: DetectRequest):
-    prompt = request.prompt
-
+async def evaluate_detect(prompt: str, session: Optional[RealtimeSession] = None) -> dict:
+    """/detect response body; shared by the POST and streaming endpoints.
+    A streaming connection's realtime session records the verdict."""
     if not prompt or len(prompt.strip()) == 0:
         return {"state": "SAFE", "button_enabled": True, "reason": None, "matched_patterns": []}
 
-    result = final_decision(prompt)
+    result = await afinal_decision(prompt)
+    if session is not None and "threat_score" in result:
+        with session.lock:
+            # A newer edit may have landed meanwhile; its diff state is kept
+            if session.text == prompt:
+                session.record(result["threat_score"], result.get("reason", ""))
+    # /scan on the same text reuses this verdict instead of re-scoring it
+    token = issue_verdict_token(prompt, result)
 
     if result["decision"] == "BLOCK":
         return {
             "state": "BLOCK", "button_enabled": False,
             "reason": result["reason"],
-            "matched_patterns": result.get("matched_patterns", [])
+            "matched_patterns": result.get("matched_patterns", []),
+            "verdict_token": token
         }
     elif result["decision"] == "ALLOW_WITH_WARNING":
         return {
             "state": "WARNING", "button_enabled": True,
             "reason": result["reason"],
-            "matched_patterns": result.get("matched_patterns", [])
+            "matched_patterns": result.get("matched_patterns", []),
+            "verdict_token": token
         }
     else:
-        return {"state": "SAFE", "button_enabled": True, "reason": None, "matched_patterns": []}
+        return {"state": "SAFE", "button_enabled": True, "reason": None, "matched_patterns": [],
+                "verdict_token": token}
+
+
+@app.post("/detect")
+async def detect_prompt(request: DetectRequest):
+    return await evaluate_detect(request.prompt)
+
+
+@app.websocket("/detect/stream")
+async def detect_stream(websocket: WebSocket):
+    """
+    One connection per editor session. The client sends {"seq", "text"}
+    on every edit; each message supersedes the previous one, so an
+    evaluation still in its debounce window (or awaiting the guard) is
+    cancelled and only the latest text is scored. Replies echo seq.
+
+    The connection owns a realtime session (dropped on disconnect) that
+    diffs each edit and decides how soon it is scored: an edit introducing
+    an injection cue at once, one the session wants re-scored (a cue
+    change, REALTIME_MIN_CHAR_DELTA characters edited, or no verdict yet)
+    after the debounce, and a small edit only once REALTIME_LLM_INTERVAL
+    passes without another message. Resending the last scored text
+    replays its verdict.
+    """
+    await websocket.accept()
+    session_id = REALTIME_SESSIONS.open()
+    pending: asyncio.Task = None
+    last_scored: Optional[Tuple[str, dict]] = None
+
+    async def evaluate(seq: int, text: str, debounce: float):
+        nonlocal last_scored
+        await asyncio.sleep(debounce)
+        started = time.perf_counter()
+        try:
+            payload = await evaluate_detect(text, REALTIME_SESSIONS.get(session_id))
+            last_scored = (text, payload)
+        except (CPUPoolSaturated, LLMBudgetExhausted) as e:
+            # No verdict token: /scan scores the text itself
+            payload = {"state": "BUSY", "retry_after": e.retry_after}
+        perf_metrics.observe("detect_stream.evaluate", time.perf_counter() - started)
+        try:
+            await websocket.send_json({"seq": seq, **payload})
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                seq, text = int(message.get("seq", 0)), str(message.get("text", ""))
+            except (ValueError, TypeError, AttributeError):
+                continue  # malformed message: keep the session alive
+            perf_metrics.incr("detect_stream.messages")
+            if pending and not pending.done():
+                pending.cancel()
+                perf_metrics.incr("detect_stream.superseded")
+
+            session = REALTIME_SESSIONS.get(session_id)
+            with session.lock:
+                rescore = session.observe(text)
+                new_cues = session.new_cues
+            if last_scored is not None and last_scored[0] == text:
+                perf_metrics.incr("detect_stream.replayed")
+                await websocket.send_json({"seq": seq, **last_scored[1]})
+                continue
+            if new_cues:
+                perf_metrics.incr("detect_stream.cue_escalations")
+                debounce = 0
+            elif rescore:
+                debounce = DETECT_STREAM_DEBOUNCE
+            else:
+                perf_metrics.incr("detect_stream.deferred")
+                debounce = max(DETECT_STREAM_DEBOUNCE, REALTIME_LLM_INTERVAL)
+            pending = asyncio.create_task(evaluate(seq, text, debounce))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pending and not pending.done():
+            pending.cancel()
+        REALTIME_SESSIONS.drop(session_id)
 
 
 @app.get("/logs")
-async def get_logs(limit: int = 50):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT scan_id, timestamp, input_value, verdict, reason
-        FROM scans ORDER BY timestamp DESC LIMIT ?
-    ''', (limit,))
-    rows = cursor.fetchall()
-    conn.close()
+def get_logs(limit: int = 50):
+    with DB.connection() as conn:
+        rows = conn.execute('''
+            SELECT scan_id, timestamp, input_value, verdict, reason
+            FROM scans ORDER BY timestamp DESC LIMIT ?
+        ''', (limit,)).fetchall()
 
     return {
         "logs": [
@@ -546,16 +1075,15 @@ async def get_logs(limit: int = 50):
 
 
 @app.get("/metrics")
-async def get_metrics():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM scans")
-    total = cursor.fetchone()[0]
-    cursor.execute("SELECT COUNT(*) FROM scans WHERE verdict = 'THREAT'")
-    threats = cursor.fetchone()[0]
-    cursor.execute("SELECT COUNT(*) FROM scans WHERE verdict = 'SAFE'")
-    safe = cursor.fetchone()[0]
-    conn.close()
+def get_metrics():
+    # One scan of the table instead of three COUNT queries
+    with DB.connection() as conn:
+        total, threats, safe = conn.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(verdict = 'THREAT'), 0),
+                   COALESCE(SUM(verdict = 'SAFE'), 0)
+            FROM scans
+        ''').fetchone()
 
     return {
         "total_scans": total, "threats_blocked": threats,
@@ -564,16 +1092,34 @@ async def get_metrics():
     }
 
 
+@app.get("/metrics/performance")
+async def get_performance_metrics():
+    return {
+        "fetcher": {**get_fetcher().config(), **get_fetcher().queue_depth()},
+        "blocking_pool": {
+            "workers": BLOCKING_WORKERS,
+            "queued": BLOCKING_EXECUTOR.queued,
+            "running": BLOCKING_EXECUTOR.running,
+        },
+        "cpu_pool": get_cpu_pool().stats(),
+        "storage": await asyncio.to_thread(DB.stats),
+        "page_cache": await asyncio.to_thread(PAGE_CACHE.stats),
+        "credibility_cache": await asyncio.to_thread(CREDIBILITY_STORE.stats),
+        "local_router": LOCAL_ROUTER.stats(),
+        "llm_gateway": get_gateway().stats(),
+        "guard_cache": VERDICT_CACHE.stats(),
+        "guard_cascade": cascade_stats(),
+        **perf_metrics.snapshot(),
+    }
+
+
 @app.get("/scan/urls")
-async def get_url_classifications():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT url, domain, status, reason, timestamp
-        FROM url_classifications ORDER BY timestamp DESC LIMIT 100
-    ''')
-    rows = cursor.fetchall()
-    conn.close()
+def get_url_classifications():
+    with DB.connection() as conn:
+        rows = conn.execute('''
+            SELECT url, domain, status, reason, timestamp
+            FROM url_classifications ORDER BY timestamp DESC LIMIT 100
+        ''').fetchall()
 
     safe = [{"url": r[0], "domain": r[1], "reason": r[3], "timestamp": r[4]} for r in rows if r[2] == "safe"]
     threats = [{"url": r[0], "domain": r[1], "reason": r[3], "timestamp": r[4]} for r in rows if r[2] == "threat"]
@@ -584,6 +1130,10 @@ async def get_url_classifications():
 # =====================================================
 # MAIN
 # =====================================================
+# Started as `python main.py`, every spawned CPU pool worker re-runs this
+# file's module level as __mp_main__ (under `uvicorn main:app` it does
+# not). Keep it side-effect free: no connections, threads or pools until
+# startup hooks or this block run (tests/test_cpu_pool.py).
 if __name__ == "__main__":
     init_db()
     print("=" * 60)
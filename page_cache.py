@@ -0,0 +1,224 @@
+# ==================================================
+# TRINETRA PAGE CACHE
+# Persistent TTL cache of extracted page text (SQLite)
+# ==================================================
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import perf_metrics
+import storage
+
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "1") == "1"
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+PAGE_CACHE_DEFAULT_TTL = int(os.environ.get("PAGE_CACHE_DEFAULT_TTL", str(6 * 3600)))
+
+# Domain suffix -> TTL (seconds). Price/news pages go stale in minutes,
+# reference works in days. Longest matching suffix wins.
+DOMAIN_TTLS = {
+    "kitco.com": 300,
+    "goldprice.org": 300,
+    "bullionvault.com": 300,
+    "investing.com": 300,
+    "mcxindia.com": 300,
+    "ibja.co": 600,
+    "moneycontrol.com": 900,
+    "economictimes.com": 900,
+    "livemint.com": 900,
+    "reuters.com": 900,
+    "bloomberg.com": 900,
+    "wikipedia.org": 7 * 86400,
+    "britannica.com": 7 * 86400,
+    "arxiv.org": 30 * 86400,
+    ".edu": 3 * 86400,
+    ".gov": 86400,
+}
+
+# Query parameters that never change page content
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ref", "mc_cid", "mc_eid"})
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lowercase scheme/host, no default port, no
+    fragment, tracking params dropped, remaining query sorted."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(_TRACKING_PREFIXES) or k.lower() in _TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def ttl_for_domain(domain: str) -> int:
+    best, best_len = PAGE_CACHE_DEFAULT_TTL, -1
+    for suffix, ttl in DOMAIN_TTLS.items():
+        if domain.endswith(suffix) and len(suffix) > best_len:
+            best, best_len = ttl, len(suffix)
+    return best
+
+
+@dataclass
+class CachedPage:
+    content: str
+    max_chars: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Extracted page text keyed by normalized URL, stored in SQLite.
+
+    Fresh entries are served without touching the network or the parser;
+    stale entries carrying ETag/Last-Modified are revalidated with a
+    conditional GET. Total content size is bounded by LRU eviction on
+    last access time. Methods are blocking; call them via asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = storage.connect(self.db_path)
+        if not self._schema_ready:
+            with self._lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS page_cache (
+                        url_key TEXT PRIMARY KEY,
+                        domain TEXT,
+                        content TEXT NOT NULL,
+                        max_chars INTEGER NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        fetched_at REAL NOT NULL,
+                        expires_at REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        size INTEGER NOT NULL
+                    )
+                ''')
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_access ON page_cache(last_access)")
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    def lookup(self, url: str, max_chars: int) -> Optional[CachedPage]:
+        """Returns the entry (fresh or stale) if it can satisfy max_chars."""
+        url_key = normalize_url(url)
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT content, max_chars, etag, last_modified, expires_at
+                FROM page_cache WHERE url_key = ?
+            ''', (url_key,)).fetchone()
+            if row is None or row[1] < max_chars:
+                perf_metrics.incr("page_cache.misses")
+                return None
+
+            page = CachedPage(row[0][:max_chars], row[1], row[2], row[3], row[4])
+            if page.fresh:
+                perf_metrics.incr("page_cache.hits")
+                conn.execute("UPDATE page_cache SET last_access = ? WHERE url_key = ?",
+                             (time.time(), url_key))
+                conn.commit()
+            else:
+                perf_metrics.incr("page_cache.stale")
+            return page
+
+    def store(self, url: str, domain: str, content: str, max_chars: int,
+              etag: Optional[str] = None, last_modified: Optional[str] = None):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO page_cache
+                (url_key, domain, content, max_chars, etag, last_modified,
+                 fetched_at, expires_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (normalize_url(url), domain, content, max_chars, etag, last_modified,
+                  now, now + ttl_for_domain(domain), now, size))
+            self._evict(conn)
+            conn.commit()
+
+    def revalidated(self, url: str, domain: str):
+        """A 304 came back: extend the entry without re-downloading it."""
+        perf_metrics.incr("page_cache.revalidated")
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE page_cache SET expires_at = ?, last_access = ? WHERE url_key = ?
+            ''', (now + ttl_for_domain(domain), now, normalize_url(url)))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until back under budget
+        evicted = 0
+        for url_key, size in conn.execute(
+                "SELECT url_key, size FROM page_cache ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM page_cache WHERE url_key = ?", (url_key,))
+            total -= size
+            evicted += 1
+        perf_metrics.incr("page_cache.evictions", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = perf_metrics.get_counter("page_cache.hits")
+        revalidated = perf_metrics.get_counter("page_cache.revalidated")
+        misses = perf_metrics.get_counter("page_cache.misses")
+        stale = perf_metrics.get_counter("page_cache.stale")
+        lookups = hits + misses + stale
+
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_cache").fetchone()
+
+        return {
+            "enabled": PAGE_CACHE_ENABLED,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "stale": stale,
+            # 304 revalidations also skip download and parsing
+            "hit_rate": round((hits + revalidated) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,102 @@
+# ==================================================
+# TRINETRA PERFORMANCE METRICS
+# In-process counters and latency recorders
+# ==================================================
+
+import threading
+from collections import deque
+from typing import Dict, Any
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_recorders: Dict[str, "LatencyRecorder"] = {}
+
+
+class LatencyRecorder:
+    """
+    Keeps a bounded window of latency samples (seconds) plus cumulative
+    histogram bucket counts. Safe to call from worker threads.
+    """
+
+    def __init__(self, window: int = 2048):
+        self._samples = deque(maxlen=window)
+        self._buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if ms <= bound:
+                    self._buckets[i] += 1
+                    break
+            else:
+                self._buckets[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            buckets = list(self._buckets)
+            count, total = self._count, self._total
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 2)
+
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+            "histogram": dict(zip(labels, buckets)),
+        }
+
+
+def incr(name: str, amount: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def get_counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def recorder(name: str) -> LatencyRecorder:
+    with _lock:
+        if name not in _recorders:
+            _recorders[name] = LatencyRecorder()
+        return _recorders[name]
+
+
+def observe(name: str, seconds: float):
+    recorder(name).observe(seconds)
+
+
+def snapshot() -> Dict[str, Any]:
+    """All counters and latency summaries, for the /metrics/performance endpoint."""
+    with _lock:
+        counters = dict(_counters)
+        recorders = dict(_recorders)
+    return {
+        "counters": counters,
+        "latency": {name: rec.snapshot() for name, rec in sorted(recorders.items())},
+    }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _recorders.clear()
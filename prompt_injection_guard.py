@@ -3,91 +3,301 @@
 # Groq LLM-Based Security (Fast Cloud API)
 # ==================================================
 
+import importlib.util
+import os
+import re
 import sys
-from typing import Dict, Any, Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple
+
+import perf_metrics
+from cpu_pool import get_cpu_pool, CPUPoolSaturated
+from llm_gateway import LLMBudgetExhausted
 
 # Import the Groq-based detector
-from groq_injection_guard import detect_prompt_injection, get_threat_indicator
+from groq_injection_guard import (
+    detect_prompt_injection,
+    adetect_prompt_injection,
+    get_threat_indicator,
+)
 
 # ==================================================
-# REALTIME CACHE (PER SESSION)
+# REALTIME SESSIONS
 # ==================================================
 
-LAST_ANALYSIS = {
-    "text": "",
-    "score": 0
+MIN_CHAR_DELTA = int(os.environ.get("REALTIME_MIN_CHAR_DELTA", "12"))  # edited chars before re-scoring
+REALTIME_LLM_INTERVAL = float(os.environ.get("REALTIME_LLM_INTERVAL", "1.5"))  # per-session LLM debounce (s)
+REALTIME_MAX_SESSIONS = int(os.environ.get("REALTIME_MAX_SESSIONS", "1000"))
+REALTIME_SESSION_TTL = float(os.environ.get("REALTIME_SESSION_TTL", "900"))  # idle seconds
+# Context scanned on each side of an edit so a cue it completes or splits
+# is seen whole: the longest text a REALTIME_CUES pattern can match
+# (instruction_override: 9 + 30 + 8 + 20 + 12 characters)
+REALTIME_CONTEXT_CHARS = 79
+
+# Cheap local cues checked on the edited region only; a new cue escalates
+# to the LLM immediately instead of waiting out the debounce
+REALTIME_CUES = {
+    "instruction_override": r"\b(ignore|disregard|forget)\b.{0,30}\b(previous|prior|above|all)\b.{0,20}\b(instructions?|rules|prompts?)\b",
+    "role_switch": r"\b(you are now|act as|pretend (to be|you)|from now on you)\b",
+    "prompt_extraction": r"\b(system prompt|hidden instructions|reveal your (prompt|instructions|rules))\b",
+    "jailbreak": r"\b(jailbreak|dan mode|developer mode|do anything now|no (restrictions|guidelines|filters))\b",
+    "safety_bypass": r"\b(bypass|disable|override)\b.{0,20}\b(safety|filters?|guardrails?|restrictions)\b",
 }
+COMPILED_REALTIME_CUES = {name: re.compile(p, re.IGNORECASE) for name, p in REALTIME_CUES.items()}
+
+
+def _status_for(score: int) -> str:
+    if score >= 7:
+        return "BLOCK"
+    if score >= 5:
+        return "WARNING"
+    return "SAFE"
+
+
+def _scan_cues(text: str) -> Set[str]:
+    return {name for name, rx in COMPILED_REALTIME_CUES.items() if rx.search(text)}
+
+
+def _changed_region(old: str, new: str) -> Tuple[int, int, int]:
+    """(start, old_end, new_end) of the single edited span, via the common
+    prefix and suffix; old[start:old_end] was replaced by new[start:new_end]."""
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return start, len(old) - suffix, len(new) - suffix
+
+
+class RealtimeSession:
+    """
+    Typing state of one editor session.
+
+    Each update is diffed against the previous text; only the edited span
+    (plus a little context) is scanned for local cues. The LLM is
+    consulted when a cue appears or disappears, or once enough characters
+    have been edited since the last verdict and the per-session debounce
+    interval has passed. Edit volume is counted as replaced characters,
+    so same-length rewrites still trigger a re-score.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.text = ""
+        self.score = 0
+        self.reason = ""
+        self.cues: Set[str] = set()
+        self.new_cues: Set[str] = set()  # cues the latest edit introduced
+        self.scored = False
+        self.edited_since_llm = 0
+        self.last_llm_at = 0.0
+        self.last_seen = time.monotonic()
+
+    def observe(self, text: str) -> bool:
+        """Folds in the new text; returns True when the LLM should re-score."""
+        self.last_seen = time.monotonic()
+        start, old_end, new_end = _changed_region(self.text, text)
+        self.new_cues = set()
+        if start == old_end == new_end:
+            return False
+
+        removed = self.text[max(0, start - REALTIME_CONTEXT_CHARS):old_end + REALTIME_CONTEXT_CHARS]
+        added = text[max(0, start - REALTIME_CONTEXT_CHARS):new_end + REALTIME_CONTEXT_CHARS]
+        cues_before, cues_after = _scan_cues(removed), _scan_cues(added)
+        self.edited_since_llm += max(old_end - start, new_end - start)
+        self.text = text
+
+        # Cues outside the window are unchanged; inside it, trust the new scan
+        self.cues = (self.cues - cues_before) | cues_after
+        self.new_cues = cues_after - cues_before
+        if self.new_cues or (cues_before - cues_after and self.score >= 5):
+            perf_metrics.incr("realtime.cue_escalations")
+            return True
+
+        if not self.scored:
+            return self._debounce_elapsed()
+        return self.edited_since_llm >= MIN_CHAR_DELTA and self._debounce_elapsed()
+
+    def _debounce_elapsed(self) -> bool:
+        return time.monotonic() - self.last_llm_at >= REALTIME_LLM_INTERVAL
+
+    def record(self, score: int, reason: str):
+        self.score, self.reason = score, reason
+        self.scored = True
+        self.edited_since_llm = 0
+        self.last_llm_at = time.monotonic()
+
+    def verdict(self, cached: bool) -> Dict[str, Any]:
+        score = self.score
+        if self.cues and score < 5:
+            # Cue seen but the LLM has not re-scored yet: never show SAFE
+            score = 5
+        result = {"status": _status_for(score), "ml_score": score / 10.0}
+        if cached:
+            result["cached"] = True
+        if self.reason:
+            result["reason"] = self.reason
+        if self.cues:
+            result["local_cues"] = sorted(self.cues)
+        return result
+
+
+class RealtimeSessions:
+    """
+    Bounded LRU of sessions; idle ones expire after REALTIME_SESSION_TTL.
+    Sessions are keyed by the caller's connection (open() on connect,
+    drop() on disconnect), so no state is shared between clients.
+    """
+
+    def __init__(self, max_sessions: int = REALTIME_MAX_SESSIONS, idle_ttl: float = REALTIME_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, RealtimeSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> RealtimeSession:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.last_seen > self.idle_ttl:
+                session = self._sessions[session_id] = RealtimeSession()
+            self._sessions.move_to_end(session_id)
+
+            # Least recently used first: drop idle sessions, then overflow
+            while self._sessions:
+                oldest_id, oldest = next(iter(self._sessions.items()))
+                if len(self._sessions) <= self.max_sessions and now - oldest.last_seen <= self.idle_ttl:
+                    break
+                if oldest_id == session_id:
+                    break
+                del self._sessions[oldest_id]
+                perf_metrics.incr("realtime.sessions_evicted")
+            return session
+
+    def open(self) -> str:
+        """Creates a session under a fresh id and returns the id."""
+        session_id = uuid.uuid4().hex
+        self.get(session_id)
+        return session_id
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+REALTIME_SESSIONS = RealtimeSessions()
 
-MIN_CHAR_DELTA = 12  # rerun detection only after significant change
 
 # ==================================================
 # PHASE 1 — REALTIME (TYPING)
 # ==================================================
 
-def realtime_detect(text: str) -> Dict[str, Any]:
+def realtime_detect(text: str, session_id: str) -> Dict[str, Any]:
     """
     Real-time detection for live typing feedback.
-    Uses caching to avoid excessive API calls.
+    session_id comes from REALTIME_SESSIONS.open(). Per-session, diff-based: unchanged or lightly edited text is answered
+    from the session's last verdict without an API call.
     """
-    global LAST_ANALYSIS
-
     if not text.strip():
         return {
             "status": "SAFE",
             "ml_score": 0.0
         }
 
-    # Cache check - avoid repeated API calls for small changes
-    if abs(len(text) - len(LAST_ANALYSIS["text"])) < MIN_CHAR_DELTA:
-        score = LAST_ANALYSIS["score"]
-        if score >= 7:
-            status = "BLOCK"
-        elif score >= 5:
-            status = "WARNING"
-        else:
-            status = "SAFE"
+    session = REALTIME_SESSIONS.get(session_id)
+    with session.lock:
+        if not session.observe(text):
+            perf_metrics.incr("realtime.cached")
+            return session.verdict(cached=True)
 
-        return {
-            "status": status,
-            "ml_score": score / 10.0,
-            "cached": True
-        }
+        # Run Groq detection
+        try:
+            perf_metrics.incr("realtime.llm_calls")
+            result = detect_prompt_injection(text)
+            session.record(result["score"], result.get("reason", ""))
+            return session.verdict(cached=False)
 
-    # Run Groq detection
-    try:
-        result = detect_prompt_injection(text)
-        score = result["score"]
+        except Exception as e:
+            print(f"[ERROR] Realtime detection failed: {e}", file=sys.stderr)
+            return {
+                "status": "SAFE",
+                "ml_score": 0.0,
+                "error": str(e)
+            }
 
-        LAST_ANALYSIS = {
-            "text": text,
-            "score": score
-        }
 
-        if score >= 7:
-            status = "BLOCK"
-        elif score >= 5:
-            status = "WARNING"
-        else:
-            status = "SAFE"
+# ==================================================
+# PHASE 2 — FINAL DECISION
+# ==================================================
+
+def _empty_decision() -> Dict[str, Any]:
+    return {
+        "decision": "SAFE",
+        "status": "ALLOWED",
+        "risk_level": "LOW",
+        "ml_score": 0.0
+    }
 
+
+def _decision_from_assessment(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a Groq guard assessment (1-10 score) onto the API decision."""
+    score = result["score"]
+    reason = result.get("reason", "")
+
+    # HIGH RISK (score 7-10) -> BLOCK
+    if score >= 7:
         return {
-            "status": status,
+            "decision": "BLOCK",
+            "status": "BLOCKED",
+            "risk_level": "HIGH",
             "ml_score": score / 10.0,
-            "reason": result.get("reason", "")
+            "threat_score": score,
+            "reason": reason or "High-confidence injection detected",
+            "threat_indicator": get_threat_indicator(score)
         }
 
-    except Exception as e:
-        print(f"[ERROR] Realtime detection failed: {e}", file=sys.stderr)
+    # MEDIUM RISK (score 5-6) -> ALLOW WITH WARNING
+    if score >= 5:
         return {
-            "status": "SAFE",
-            "ml_score": 0.0,
-            "error": str(e)
+            "decision": "ALLOW_WITH_WARNING",
+            "status": "ALLOWED",
+            "risk_level": "MEDIUM",
+            "ml_score": score / 10.0,
+            "threat_score": score,
+            "reason": reason or "Suspicious patterns detected",
+            "threat_indicator": get_threat_indicator(score)
         }
 
+    # LOW RISK (score 1-4) -> SAFE
+    return {
+        "decision": "SAFE",
+        "status": "ALLOWED",
+        "risk_level": "LOW",
+        "ml_score": score / 10.0,
+        "threat_score": score,
+        "reason": reason,
+        "threat_indicator": get_threat_indicator(score)
+    }
+
+
+def _failed_decision(e: Exception) -> Dict[str, Any]:
+    print(f"[ERROR] Final decision failed: {e}", file=sys.stderr)
+    # Fail-safe: block on error
+    return {
+        "decision": "BLOCK",
+        "status": "BLOCKED",
+        "risk_level": "HIGH",
+        "reason": f"Security check failed: {str(e)}"
+    }
 
-# ==================================================
-# PHASE 2 — FINAL DECISION
-# ==================================================
 
 def final_decision(
     text: str,
@@ -95,69 +305,257 @@ def final_decision(
 ) -> Dict[str, Any]:
     """
     Final security decision before processing.
-    Returns structured response for API compatibility.
+    Runs the tiered cascade; only inputs the local tiers cannot settle
+    reach the Groq guard. Returns structured response for API compatibility.
     """
 
     if not text.strip():
-        return {
-            "decision": "SAFE",
-            "status": "ALLOWED",
-            "risk_level": "LOW",
-            "ml_score": 0.0
-        }
+        return _empty_decision()
 
     try:
         # Combine with prior context if provided
         combined_text = f"{prior_context} {text}".strip() if prior_context else text
 
-        result = detect_prompt_injection(combined_text)
-        score = result["score"]
-        reason = result.get("reason", "")
+        decision, heuristic, timings = local_tiers(combined_text)
+        _record_tiers(timings)
+        if decision is None:
+            started = time.perf_counter()
+            decision = _llm_decision(detect_prompt_injection(combined_text), heuristic, started)
+        return _exit(decision)
 
-        # HIGH RISK (score 7-10) -> BLOCK
-        if score >= 7:
-            return {
-                "decision": "BLOCK",
-                "status": "BLOCKED",
-                "risk_level": "HIGH",
-                "ml_score": score / 10.0,
-                "threat_score": score,
-                "reason": reason or "High-confidence injection detected",
-                "threat_indicator": get_threat_indicator(score)
-            }
+    except Exception as e:
+        return _failed_decision(e)
 
-        # MEDIUM RISK (score 5-6) -> ALLOW WITH WARNING
-        if score >= 5:
-            return {
-                "decision": "ALLOW_WITH_WARNING",
-                "status": "ALLOWED",
-                "risk_level": "MEDIUM",
-                "ml_score": score / 10.0,
-                "threat_score": score,
-                "reason": reason or "Suspicious patterns detected",
-                "threat_indicator": get_threat_indicator(score)
-            }
 
-        # LOW RISK (score 1-4) -> SAFE
-        return {
-            "decision": "SAFE",
-            "status": "ALLOWED",
-            "risk_level": "LOW",
-            "ml_score": score / 10.0,
-            "threat_score": score,
-            "reason": reason,
-            "threat_indicator": get_threat_indicator(score)
-        }
+async def afinal_decision(
+    text: str,
+    prior_context: Optional[str] = ""
+) -> Dict[str, Any]:
+    """
+    Async final_decision() for the FastAPI handlers.
+    Awaits the Groq guard instead of blocking the event loop.
+    """
+
+    if not text.strip():
+        return _empty_decision()
+
+    try:
+        combined_text = f"{prior_context} {text}".strip() if prior_context else text
+
+        # Heuristics and DeBERTa hold the GIL: run them in a worker process
+        decision, heuristic, timings, engine = await get_cpu_pool().run(pooled_local_tiers, combined_text)
+        _record_tiers(timings)
+        _record_engine(engine)
+        if decision is None:
+            started = time.perf_counter()
+            decision = _llm_decision(await adetect_prompt_injection(combined_text), heuristic, started)
+        return _exit(decision)
 
+    except (CPUPoolSaturated, LLMBudgetExhausted):
+        raise  # surfaced as 503, not as a BLOCK verdict
     except Exception as e:
-        print(f"[ERROR] Final decision failed: {e}", file=sys.stderr)
-        # Fail-safe: block on error
-        return {
-            "decision": "BLOCK",
-            "status": "BLOCKED",
-            "risk_level": "HIGH",
-            "reason": f"Security check failed: {str(e)}"
+        return _failed_decision(e)
+
+
+# ==================================================
+# TIERED CASCADE
+# ==================================================
+
+# Tier 1: local heuristics settle clear attacks (BLOCK only). Tier 2: the
+# ProtectAI model (when transformers is installed) may BLOCK or confirm
+# SAFE. Tier 3: the Groq guard, for inputs neither tier could settle.
+# A heuristic risk of 0 is not evidence of safety (paraphrased, foreign
+# language or obfuscated attacks score 0), so the heuristic SAFE exit is
+# off unless CASCADE_SAFE_MAX is set to a risk >= 0. Likewise a high risk
+# built only from tactic or structure signals (quoted text, "system",
+# "override") is not proof of an attack: the heuristic BLOCK exit needs
+# an intent category or a standalone high-risk pattern to have matched.
+CASCADE_ENABLED = os.environ.get("GUARD_CASCADE", "1") == "1"
+CASCADE_SAFE_MAX = float(os.environ.get("CASCADE_SAFE_MAX", "-1"))     # heuristic risk <= this: SAFE (-1 = never)
+CASCADE_BLOCK_MIN = float(os.environ.get("CASCADE_BLOCK_MIN", "12"))   # heuristic risk >= this: BLOCK
+CASCADE_ML = os.environ.get("CASCADE_ML", "auto").lower()              # auto | 1 | 0
+CASCADE_ML_BLOCK = float(os.environ.get("CASCADE_ML_BLOCK", "0.9"))    # INJECTION prob >= this: BLOCK
+CASCADE_ML_SAFE = float(os.environ.get("CASCADE_ML_SAFE", "0.9"))      # SAFE prob >= this: SAFE
+
+CASCADE_TIERS = ("heuristic", "ml", "llm")
+
+HEURISTIC_ENGINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Trinetra-Private-one--main", "prompt_injection_guard.py"
+)
+
+
+def _load_heuristic_engine():
+    """The intent-aware engine lives in the private tree, which is not a
+    package; load it from its file path."""
+    try:
+        spec = importlib.util.spec_from_file_location("trinetra_heuristic_guard", HEURISTIC_ENGINE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except (OSError, ImportError, AttributeError) as e:
+        print(f"[WARNING] Heuristic guard unavailable ({e}); cascade sends every input to Groq.")
+        return None
+
+
+HEURISTICS = _load_heuristic_engine() if CASCADE_ENABLED else None
+
+
+def _ml_tier_enabled() -> bool:
+    if HEURISTICS is None or CASCADE_ML == "0":
+        return False
+    return CASCADE_ML == "1" or importlib.util.find_spec("transformers") is not None
+
+
+ML_TIER_ENABLED = _ml_tier_enabled()
+
+
+def warm_ml_tier():
+    """Loads and warms the DeBERTa engine (blocking); call at startup so
+    no request pays the model load."""
+    if ML_TIER_ENABLED:
+        HEURISTICS.ML_ENGINE.load()
+
+
+def _tier_decision(tier: str, score: int, reason: str, heuristic: Dict[str, Any]) -> Dict[str, Any]:
+    decision = _decision_from_assessment({"score": score, "reason": reason})
+    decision["tier"] = tier
+    decision["heuristic_risk"] = heuristic["risk_score"]
+    decision["matched_patterns"] = heuristic["matched_patterns"]
+    return decision
+
+
+def _heuristic_tier(text: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(decision or None to escalate, heuristic analysis)"""
+    if HEURISTICS is None:
+        return None, None
+    heuristic = HEURISTICS.final_decision(text, use_ml=False)
+
+    risk = heuristic["risk_score"]
+    if risk >= CASCADE_BLOCK_MIN and heuristic["detected_intents"]:
+        return _tier_decision("heuristic", 9, heuristic["reason"], heuristic), heuristic
+    if risk <= CASCADE_SAFE_MAX:
+        return _tier_decision("heuristic", 1, "", heuristic), heuristic
+    return None, heuristic
+
+
+def _ml_tier(text: str, heuristic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    ml = HEURISTICS.ml_detect(text)
+    if not ml["ml_available"]:
+        return None
+
+    if ml["label"] == "INJECTION" and ml["score"] >= CASCADE_ML_BLOCK:
+        return _tier_decision("ml", 9, f"ML: injection detected ({ml['score'] * 100:.1f}% confidence)", heuristic)
+    # Only a fully scored input may exit SAFE: text past ML_MAX_WINDOWS
+    # was never seen by the model
+    truncated = bool(ml.get("windows") and ml["windows"].get("truncated"))
+    if ml["label"] == "SAFE" and ml["score"] >= CASCADE_ML_SAFE and not truncated:
+        return _tier_decision("ml", 2, "", heuristic)
+    if truncated:
+        perf_metrics.incr("guard.ml_truncated")
+    return None
+
+
+def local_tiers(text: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Dict[str, float]]:
+    """
+    Heuristic then ML tier: (decision or None to escalate, heuristic
+    analysis, seconds per tier run). CPU-bound; afinal_decision runs it in
+    the CPU pool, so tier latencies are returned for the caller to record.
+    """
+    timings = {}
+    started = time.perf_counter()
+    decision, heuristic = _heuristic_tier(text)
+    timings["heuristic"] = time.perf_counter() - started
+    if decision is None and heuristic is not None and ML_TIER_ENABLED:
+        started = time.perf_counter()
+        decision = _ml_tier(text, heuristic)
+        timings["ml"] = time.perf_counter() - started
+    return decision, heuristic, timings
+
+
+def _record_tiers(timings: Dict[str, float]):
+    for tier, seconds in timings.items():
+        perf_metrics.observe(f"guard.tier.{tier}", seconds)
+
+
+def pooled_local_tiers(text: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Dict[str, float],
+                                          Optional[Tuple[int, Dict[str, Any]]]]:
+    """
+    local_tiers() plus (pid, engine stats) of the process that ran it.
+    Each CPU pool worker loads its own DeBERTa engine and the server
+    process never does, so the stats travel back with every result.
+    """
+    decision, heuristic, timings = local_tiers(text)
+    engine = (os.getpid(), HEURISTICS.ML_ENGINE.stats()) if ML_TIER_ENABLED else None
+    return decision, heuristic, timings, engine
+
+
+# Latest engine stats per CPU pool worker, as of that worker's last task
+_WORKER_ENGINES: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_WORKER_ENGINES_LOCK = threading.Lock()
+
+
+def _record_engine(engine: Optional[Tuple[int, Dict[str, Any]]]):
+    if engine is None:
+        return
+    pid, stats = engine
+    with _WORKER_ENGINES_LOCK:
+        _WORKER_ENGINES[pid] = stats
+        _WORKER_ENGINES.move_to_end(pid)
+        # Workers replaced after a broken pool drop out
+        while len(_WORKER_ENGINES) > get_cpu_pool().workers:
+            _WORKER_ENGINES.popitem(last=False)
+
+
+def _ml_engine_stats() -> Optional[Dict[str, Any]]:
+    if not ML_TIER_ENABLED:
+        return None
+    if not get_cpu_pool().enabled:
+        return HEURISTICS.ML_ENGINE.stats()
+    with _WORKER_ENGINES_LOCK:
+        workers = {str(pid): stats for pid, stats in _WORKER_ENGINES.items()}
+    # A worker appears once it has scored its first input
+    return {"source": "cpu_pool_workers", "workers": workers}
+
+
+def _llm_decision(assessment: Dict[str, Any], heuristic: Optional[Dict[str, Any]],
+                  started: float) -> Dict[str, Any]:
+    perf_metrics.observe("guard.tier.llm", time.perf_counter() - started)
+    decision = _decision_from_assessment(assessment)
+    decision["tier"] = "llm"
+    if heuristic is not None:
+        decision["heuristic_risk"] = heuristic["risk_score"]
+        decision["matched_patterns"] = heuristic["matched_patterns"]
+    return decision
+
+
+def _exit(decision: Dict[str, Any]) -> Dict[str, Any]:
+    perf_metrics.incr(f"guard.exit.{decision['tier']}")
+    return decision
+
+
+def cascade_stats() -> Dict[str, Any]:
+    exits = {tier: perf_metrics.get_counter(f"guard.exit.{tier}") for tier in CASCADE_TIERS}
+    total = sum(exits.values())
+    tiers = {}
+    for tier in CASCADE_TIERS:
+        latency = perf_metrics.recorder(f"guard.tier.{tier}").snapshot()
+        tiers[tier] = {
+            "exits": exits[tier],
+            "exit_fraction": round(exits[tier] / total, 3) if total else 0.0,
+            "p50_ms": latency["p50_ms"],
+            "p99_ms": latency["p99_ms"],
         }
+    return {
+        "enabled": HEURISTICS is not None,
+        "ml_tier": ML_TIER_ENABLED,
+        "thresholds": {
+            "safe_max": CASCADE_SAFE_MAX, "block_min": CASCADE_BLOCK_MIN,
+            "ml_block": CASCADE_ML_BLOCK, "ml_safe": CASCADE_ML_SAFE,
+        },
+        "decisions": total,
+        "tiers": tiers,
+        "ml_engine": _ml_engine_stats(),
+    }
 
 
 # ==================================================
@@ -180,7 +578,8 @@ if __name__ == "__main__":
     print("TRINETRA — GROQ PROMPT INJECTION GUARD")
     print("=" * 60)
 
+    session_id = REALTIME_SESSIONS.open()
     for t in tests:
         print(f"\nINPUT: {t}")
-        print("Realtime:", realtime_detect(t))
+        print("Realtime:", realtime_detect(t, session_id))
         print("Final:   ", final_decision(t))
@@ -0,0 +1,94 @@
+# ==================================================
+# TRINETRA STORAGE
+# Pooled, WAL-mode SQLite connections
+# ==================================================
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict
+
+import perf_metrics
+
+# WAL: readers never block the writer and commits append to the log
+# instead of rewriting the journal. NORMAL skips the fsync per commit
+# (durable across app crashes; the last commits can be lost on power loss).
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_KB = int(os.environ.get("SQLITE_CACHE_KB", "16384"))
+SQLITE_MMAP_BYTES = int(os.environ.get("SQLITE_MMAP_BYTES", str(64 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "5"))
+# Compiled statements kept per connection, keyed by SQL text
+SQLITE_STATEMENT_CACHE = int(os.environ.get("SQLITE_STATEMENT_CACHE", "256"))
+
+
+class Database:
+    """
+    One long-lived connection per thread for a SQLite file.
+
+    The blocking pool's threads are long-lived, so each opens its
+    connection once (pragmas applied once) and reuses it; sqlite3 keeps
+    every statement it has compiled on that connection, so repeated SQL
+    skips the parse/prepare step. Use the connection as a context manager
+    (`with db.connection() as conn:`) to commit or roll back; never close
+    it. A thread's connection is closed when the thread exits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT,
+                               cached_statements=SQLITE_STATEMENT_CACHE)
+        conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._opened += 1
+        perf_metrics.incr("storage.connections_opened")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def stats(self) -> Dict[str, Any]:
+        row = self.connection().execute("PRAGMA journal_mode").fetchone()
+        with self._lock:
+            opened = self._opened
+        return {
+            "path": self.path,
+            "journal_mode": row[0],
+            "synchronous": SQLITE_SYNCHRONOUS,
+            "cache_kb": SQLITE_CACHE_KB,
+            "mmap_bytes": SQLITE_MMAP_BYTES,
+            "connections_opened": opened,
+        }
+
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path: str) -> Database:
+    """Shared Database for a file, so every module reuses the same
+    per-thread connections."""
+    key = os.path.abspath(path)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = _databases[key] = Database(path)
+        return db
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """The calling thread's pooled connection to path."""
+    return get_database(path).connection()
+
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Modules read their configuration at import: no real Groq key, no
+# persisted guard cache in the working tree, CPU-bound work in threads
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("GUARD_CACHE_PERSIST", "0")
+os.environ.setdefault("CPU_POOL_ENABLED", "0")
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What a spawned CPU pool worker does when the server was started with
+# `python main.py`: multiprocessing re-runs the parent's __main__ file as
+# __mp_main__ before the worker's initializer (runpy.run_path)
+WORKER_IMPORT = """
+import json, multiprocessing, os, runpy, sys, threading
+sys.path.insert(0, sys.argv[1])
+runpy.run_path(os.path.join(sys.argv[1], "main.py"), run_name="__mp_main__")
+import cpu_pool
+print(json.dumps({
+    "threads": threading.active_count(),
+    "children": len(multiprocessing.active_children()),
+    "cpu_pool_started": cpu_pool._cpu_pool is not None and cpu_pool._cpu_pool._executor is not None,
+}))
+"""
+
+
+def test_main_module_level_is_side_effect_free_in_workers(tmp_path):
+    env = {**os.environ, "GROQ_API_KEY": "test", "PYTHONPATH": str(ROOT)}
+    result = subprocess.run([sys.executable, "-c", WORKER_IMPORT, str(ROOT)], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+    assert state == {"threads": 1, "children": 0, "cpu_pool_started": False}
+    # No database (or anything else) is created in the working directory
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+
+import http_client
+import perf_metrics
+
+
+def stream(body: bytes, charset: str = "utf-8") -> str:
+    """Text stream_text() hands to on_text for a body served in 3-byte chunks."""
+    parts = []
+
+    async def on_text(text):
+        parts.append(text)
+        return False
+
+    def handler(request):
+        chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+        return httpx.Response(200, headers={"content-type": f"text/html; charset={charset}"},
+                              stream=_Chunks(chunks))
+
+    async def run():
+        fetcher = http_client.PooledFetcher(host_interval=0)
+        state = fetcher._state()
+        state.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await fetcher.stream_text("https://example.com/", 1 << 20, on_text)
+        await state.client.aclose()
+
+    asyncio.run(run())
+    return "".join(parts)
+
+
+class _Chunks(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def test_multibyte_characters_split_across_chunks_are_decoded():
+    text = "नमस्ते — café ✓"
+    assert stream(text.encode("utf-8")) == text
+
+
+def test_decoder_is_flushed_at_end_of_stream():
+    # A body cut inside its last character still yields a replacement
+    # character instead of silently dropping the held-back bytes
+    assert stream("café".encode("utf-8")[:-1]) == "caf�"
+
+
+def test_reuse_counted_only_when_the_request_reached_the_server():
+    before = {name: perf_metrics.get_counter(f"fetch.connections_{name}") for name in ("reused", "new", "unused")}
+
+    http_client.PooledFetcher._record({"http11.receive_response_headers.complete": 1.0}, 0.0)
+    http_client.PooledFetcher._record({}, 0.0)  # cancelled while queued
+    http_client.PooledFetcher._record({"connection.connect_tcp.started": 1.0}, 0.0)
+
+    after = {name: perf_metrics.get_counter(f"fetch.connections_{name}") for name in before}
+    assert {name: after[name] - before[name] for name in before} == {"reused": 1, "new": 1, "unused": 1}
+
+
+def test_idle_hosts_are_evicted(monkeypatch):
+    monkeypatch.setattr(http_client, "FETCH_HOST_STATE_MAX", 3)
+
+    async def run():
+        state = http_client._LoopState(None, 10)
+        async with state.admit("busy.example", 2, 0):
+            for host in ("a.example", "b.example", "c.example", "d.example"):
+                async with state.admit(host, 2, 0):
+                    pass
+            return sorted(state.host_limits), sorted(state.host_next_start)
+
+    limits, next_start = asyncio.run(run())
+    assert "busy.example" in limits
+    assert len(limits) <= 3 and set(next_start) <= set(limits)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_gateway import (LLMGateway, LLMBudgetExhausted,
+                         PRIORITY_GUARD, PRIORITY_ROUTER, PRIORITY_CONTENT)
+
+
+def drained(rpm: int = 600, **kwargs) -> LLMGateway:
+    """Gateway with an empty request bucket (rpm / 60 admissions per second)."""
+    gateway = LLMGateway(rpm=rpm, tpm=1_000_000, max_retries=0, **kwargs)
+    gateway.requests.level = 0.0
+    return gateway
+
+
+def test_waiters_are_admitted_by_priority():
+    gateway = drained()
+    order = []
+
+    def call(name, priority):
+        async def factory():
+            order.append(name)
+            return name
+        return gateway.acall(priority, factory, tokens=10)
+
+    async def run():
+        await asyncio.gather(call("content", PRIORITY_CONTENT), call("router", PRIORITY_ROUTER),
+                             call("guard", PRIORITY_GUARD))
+
+    asyncio.run(run())
+    assert order == ["guard", "router", "content"]
+
+
+def test_identical_concurrent_requests_share_one_call():
+    gateway = LLMGateway(rpm=600, tpm=1_000_000, max_retries=0)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "verdict"
+
+    async def run():
+        return await asyncio.gather(*(gateway.acall(PRIORITY_GUARD, factory, tokens=10, key="same")
+                                      for _ in range(5)))
+
+    assert asyncio.run(run()) == ["verdict"] * 5
+    assert len(calls) == 1
+
+
+def test_queue_wait_is_bounded():
+    gateway = drained(rpm=1, max_queue_wait=0.05)
+
+    async def factory():
+        return "never"
+
+    started = time.perf_counter()
+    with pytest.raises(LLMBudgetExhausted) as raised:
+        asyncio.run(gateway.acall(PRIORITY_CONTENT, factory, tokens=10))
+    assert time.perf_counter() - started < 1
+    assert raised.value.retry_after >= 1
+
+
+def test_sync_queue_wait_is_bounded():
+    gateway = drained(rpm=1, max_queue_wait=0.05)
+    with pytest.raises(LLMBudgetExhausted):
+        gateway.call(PRIORITY_GUARD, lambda: "never", tokens=10)
+
+
+def test_timed_out_waiter_does_not_consume_budget():
+    gateway = drained(rpm=600, max_queue_wait=0.01)
+    order = []
+
+    async def factory(name):
+        order.append(name)
+
+    async def run():
+        with pytest.raises(LLMBudgetExhausted):
+            await gateway.acall(PRIORITY_GUARD, lambda: factory("timed out"), tokens=10)
+        gateway.max_queue_wait = 5
+        await gateway.acall(PRIORITY_CONTENT, lambda: factory("served"), tokens=10)
+
+    asyncio.run(run())
+    assert order == ["served"]
@@ -0,0 +1,73 @@
+import pytest
+
+import prompt_injection_guard as guard
+
+engine_module = guard.HEURISTICS
+pytestmark = pytest.mark.skipif(engine_module is None, reason="heuristic guard unavailable")
+
+CHARS_PER_WINDOW = 100
+
+
+class FakeTokenizer:
+    """Two tokens per character; overflow windows of CHARS_PER_WINDOW characters."""
+
+    def __call__(self, text, return_overflowing_tokens=False, **kwargs):
+        if not return_overflowing_tokens:
+            return {"input_ids": [0] * (len(text) * 2)}
+        count = max(1, -(-len(text) // CHARS_PER_WINDOW))
+        return {"input_ids": [[0]] * count, "attention_mask": [[1]] * count}
+
+
+class FakeLogits:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def tolist(self):
+        return self.rows
+
+
+class FakeModel:
+    class config:
+        label2id = {"SAFE": 0, "INJECTION": 1}
+
+    def __call__(self, input_ids, attention_mask):
+        # Confidently SAFE in every window
+        return type("Output", (), {"logits": FakeLogits([[4.0, -4.0]] * len(input_ids))})
+
+
+@pytest.fixture
+def engine():
+    engine = engine_module.InferenceEngine(backend="onnx")
+    engine.classifier = type("Classifier", (), {"tokenizer": FakeTokenizer(), "model": FakeModel()})
+    engine._attempted = True
+    return engine
+
+
+def test_windows_within_limit_cover_the_whole_input(engine):
+    result = engine.score_windows("a" * CHARS_PER_WINDOW * 3)
+    assert result["windows"] == result["windows_scored"] == 3
+    assert result["truncated"] is False
+
+
+def test_windows_past_limit_are_reported_truncated(engine):
+    result = engine.score_windows("a" * CHARS_PER_WINDOW * (engine_module.ML_MAX_WINDOWS + 5))
+    assert result["windows_scored"] == engine_module.ML_MAX_WINDOWS
+    assert result["truncated"] is True
+
+
+def test_single_window_path_measures_tokens_not_characters(engine):
+    # 300 characters but 600 tokens: does not fit one 512-token window
+    assert not engine.fits_one_window("a" * 300)
+    assert engine.fits_one_window("a" * 200)
+
+
+def test_truncated_ml_safe_escalates_to_llm(monkeypatch):
+    calls = []
+    monkeypatch.setattr(guard, "detect_prompt_injection", lambda text: calls.append(text) or {"score": 1})
+    monkeypatch.setattr(guard, "ML_TIER_ENABLED", True)
+    monkeypatch.setattr(guard.HEURISTICS, "ml_detect", lambda text: {
+        "ml_available": True, "label": "SAFE", "score": 0.99, "is_injection": False,
+        "windows": {"windows": 32, "windows_scored": 32, "truncated": True},
+    })
+    assert guard.final_decision("What is photosynthesis?")["tier"] == "llm"
+    assert len(calls) == 1
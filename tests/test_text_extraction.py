@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_extraction import STREAMING_BACKENDS, extract_text, new_streaming_extractor  # noqa: E402
+
+PAGE = (
+    "<html><head><title>Gold rates</title><style>p { color: red }</style></head>"
+    "<body><nav>Home | Markets</nav>"
+    "<h1>Gold price today</h1>"
+    "<p>The price of 24 karat gold rose to &#8377;7,250 per gram &amp; silver held steady.</p>"
+    "<div><p>Rates are indicative</p> and exclude GST.</div>"
+    "<script>var tracking = 'a < b';</script>"
+    "<footer>Copyright</footer>"
+    " Updated at 10:30 IST"
+)
+
+
+def stream(backend, html, chunk_size, max_chars=2000):
+    extractor = new_streaming_extractor(max_chars, backend)
+    for i in range(0, len(html), chunk_size):
+        if extractor.feed_chunk(html[i:i + chunk_size]):
+            break
+    return extractor.text()
+
+
+@pytest.mark.parametrize("backend", sorted(STREAMING_BACKENDS))
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_streaming_matches_full_document(backend, chunk_size):
+    expected = extract_text(PAGE, 2000, backend)
+    assert expected.endswith("Updated at 10:30 IST")
+    assert stream(backend, PAGE, chunk_size) == expected
+
+
+@pytest.mark.parametrize("backend", sorted(STREAMING_BACKENDS))
+@pytest.mark.parametrize("html", ["plain text with no tags", "<p>visible</p> after"])
+def test_text_after_last_tag_is_kept(backend, html):
+    assert stream(backend, html, 4) == extract_text(html, 2000, backend)
+
+
+@pytest.mark.parametrize("backend", sorted(STREAMING_BACKENDS))
+def test_stops_at_max_chars(backend):
+    assert stream(backend, PAGE, 7, max_chars=20) == extract_text(PAGE, 20, backend)
@@ -0,0 +1,56 @@
+import time
+
+import verdict_cache
+from verdict_cache import VerdictCache, verdict_key
+
+TEXT = "What is the capital of France?"
+SAFE = {"status": "SAFE", "threat_score": 2}
+
+
+def test_key_isolates_text_model_and_prompt_version():
+    key = verdict_key(TEXT, "model-a", "v1")
+    assert verdict_key(TEXT + "!", "model-a", "v1") != key
+    assert verdict_key(TEXT, "model-b", "v1") != key
+    assert verdict_key(TEXT, "model-a", "v2") != key
+    # Fields are separated, so shifting characters between them changes the key
+    assert verdict_key("1\x00" + TEXT, "model-a", "v") != key
+
+
+def test_key_ignores_invisible_formatting_but_not_case():
+    key = verdict_key(TEXT, "model-a", "v1")
+    assert verdict_key("  What is the　capital\n of France?\t", "model-a", "v1") == key
+    assert verdict_key(TEXT.upper(), "model-a", "v1") != key
+
+
+def test_entries_are_looked_up_by_their_own_key():
+    cache = VerdictCache(db_path=None)
+    cache.put(verdict_key(TEXT, "model-a", "v1"), SAFE)
+    assert cache.get(verdict_key(TEXT, "model-a", "v1")) == SAFE
+    assert cache.get(verdict_key(TEXT, "model-a", "v2")) is None
+    assert cache.get(verdict_key(TEXT, "model-b", "v1")) is None
+
+
+def test_memory_tier_is_bounded_and_expires(monkeypatch):
+    cache = VerdictCache(db_path=None, max_entries=2, ttl=60)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"status": name})
+    assert cache.get_memory("a") is None
+    assert cache.get_memory("c") == {"status": "c"}
+
+    now = time.time()
+    monkeypatch.setattr(verdict_cache.time, "time", lambda: now + 61)
+    assert cache.get_memory("c") is None
+
+
+def test_persistent_tier_refills_memory(monkeypatch, tmp_path):
+    monkeypatch.setattr(verdict_cache, "GUARD_CACHE_PERSIST", True)
+    db_path = str(tmp_path / "verdicts.db")
+    key = verdict_key(TEXT, "model-a", "v1")
+    VerdictCache(db_path=db_path).put(key, SAFE)
+
+    # A fresh process (empty memory tier) still finds the verdict
+    cache = VerdictCache(db_path=db_path)
+    assert cache.get_memory(key) is None
+    assert cache.get(key) == SAFE
+    assert cache.get_memory(key) == SAFE
+    assert cache.get(verdict_key(TEXT, "model-b", "v1")) is None
@@ -0,0 +1,266 @@
+# ==================================================
+# TRINETRA TEXT EXTRACTION
+# Visible-text extraction for the URL Fetcher Agent
+# ==================================================
+
+import os
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+# Optional C-accelerated parsers
+try:
+    from lxml import etree as _lxml_etree
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_etree = _lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+# Boilerplate containers whose text never reaches the output agent
+BOILERPLATE_TAGS = frozenset({"script", "style", "nav", "footer", "header", "aside", "form"})
+
+# "auto" picks the fastest installed backend: selectolax > lxml > bs4
+TEXT_EXTRACTOR = os.environ.get("TEXT_EXTRACTOR", "auto").lower()
+
+
+# ==================================================
+# FULL-DOCUMENT BACKENDS
+# ==================================================
+
+def extract_text_bs4(html: str, max_chars: int = 2000) -> str:
+    """Reference path: pure-Python html.parser tree + decompose()."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(BOILERPLATE_TAGS)):
+        tag.decompose()
+
+    text = soup.get_text(separator=" ", strip=True)
+    return text[:max_chars]
+
+
+def _join_until(strings, max_chars: int) -> str:
+    parts: List[str] = []
+    chars = 0
+    for s in strings:
+        s = s.strip()
+        if s:
+            parts.append(s)
+            chars += len(s) + 1
+            if chars >= max_chars:
+                break
+    return " ".join(parts)[:max_chars]
+
+
+def extract_text_lxml(html: str, max_chars: int = 2000) -> str:
+    """libxml2 parse; boilerplate and comments are stripped in one C pass."""
+    if not html.strip():
+        return ""
+    root = _lxml_html.document_fromstring(html)
+    _lxml_etree.strip_elements(root, _lxml_etree.Comment, *BOILERPLATE_TAGS, with_tail=False)
+    return _join_until(root.itertext(), max_chars)
+
+
+def extract_text_selectolax(html: str, max_chars: int = 2000) -> str:
+    """lexbor parse via selectolax; boilerplate removed with strip_tags()."""
+    tree = _SelectolaxParser(html)
+    tree.strip_tags(list(BOILERPLATE_TAGS))
+    root = tree.body if tree.body is not None else tree.root
+    if root is None:
+        return ""
+    return root.text(separator=" ", strip=True)[:max_chars]
+
+
+class StreamingTextExtractor(HTMLParser):
+    """
+    Incremental visible-text extractor.
+
+    Fed with decoded HTML chunks as they arrive from the network; skips
+    boilerplate containers and reports done once max_chars of visible text
+    have been collected so the caller can stop downloading. Output matches
+    BeautifulSoup.get_text(separator=" ", strip=True) on the same tree.
+
+    HTMLParser hands over a text run in pieces when it crosses a chunk
+    boundary, so pieces are buffered and the run is stripped and emitted
+    as one string at the next tag, comment or declaration (or in text()).
+    """
+
+    def __init__(self, max_chars: int = 2000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._chars = 0
+        self._skip_depth = 0
+        self._run: List[str] = []
+        self._run_chars = 0
+
+    @property
+    def done(self) -> bool:
+        return self._chars + self._run_chars >= self.max_chars
+
+    def _flush(self):
+        if not self._run:
+            return
+        text = "".join(self._run).strip()
+        self._run, self._run_chars = [], 0
+        if text and self._chars < self.max_chars:
+            self._parts.append(text)
+            self._chars += len(text) + 1
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in BOILERPLATE_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in BOILERPLATE_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        self._run.append(data)
+        self._run_chars += len(data)
+
+    def feed_chunk(self, chunk: str) -> bool:
+        """Feeds one decoded chunk; returns True once enough text is collected."""
+        if not self.done:
+            self.feed(chunk)
+        return self.done
+
+    def text(self) -> str:
+        # Emits data HTMLParser still holds back, then the pending run
+        self.close()
+        self._flush()
+        return " ".join(self._parts)[:self.max_chars]
+
+
+class LxmlStreamingExtractor:
+    """
+    Incremental extractor on libxml2's push parser (lxml HTMLPullParser).
+
+    Text is emitted only once it is complete: an element's leading text
+    when its first child starts (or when it ends childless), and a child's
+    tail when the next sibling starts or the parent ends. That keeps
+    document order without ever building text for skipped containers.
+    """
+
+    def __init__(self, max_chars: int = 2000):
+        self.max_chars = max_chars
+        self._parser = _lxml_etree.HTMLPullParser(events=("start", "end", "comment"))
+        self._closed = False
+        self._parts: List[str] = []
+        self._chars = 0
+        self._skip_depth = 0
+
+    @property
+    def done(self) -> bool:
+        return self._chars >= self.max_chars
+
+    def _emit(self, text: Optional[str]):
+        if text and not self._skip_depth:
+            text = text.strip()
+            if text:
+                self._parts.append(text)
+                self._chars += len(text) + 1
+
+    def _leading_text(self, node):
+        """Text that precedes `node` inside its parent is now complete."""
+        prev = node.getprevious()
+        if prev is not None:
+            self._emit(prev.tail)
+        else:
+            parent = node.getparent()
+            if parent is not None:
+                self._emit(parent.text)
+
+    def _drain(self):
+        for event, node in self._parser.read_events():
+            if event == "comment":
+                self._leading_text(node)
+            elif event == "start":
+                self._leading_text(node)
+                if node.tag in BOILERPLATE_TAGS:
+                    self._skip_depth += 1
+            else:
+                if len(node):
+                    self._emit(node[-1].tail)
+                else:
+                    self._emit(node.text)
+                if node.tag in BOILERPLATE_TAGS and self._skip_depth:
+                    self._skip_depth -= 1
+            if self.done:
+                break
+
+    def feed_chunk(self, chunk: str) -> bool:
+        if self.done:
+            return True
+        self._parser.feed(chunk)
+        self._drain()
+        return self.done
+
+    def text(self) -> str:
+        # Closing ends every open element, emitting text after the last tag
+        if not self._closed and not self.done:
+            self._closed = True
+            try:
+                self._parser.close()
+            except _lxml_etree.LxmlError:
+                pass  # empty or unparseable input: keep what was collected
+            self._drain()
+        return " ".join(self._parts)[:self.max_chars]
+
+
+# ==================================================
+# BACKEND REGISTRY
+# ==================================================
+
+# "bs4" names the pure-Python html.parser path in both registries
+EXTRACTION_BACKENDS: Dict[str, Callable[[str, int], str]] = {"bs4": extract_text_bs4}
+STREAMING_BACKENDS: Dict[str, Callable[[int], object]] = {"bs4": StreamingTextExtractor}
+
+if _lxml_etree is not None:
+    EXTRACTION_BACKENDS["lxml"] = extract_text_lxml
+    STREAMING_BACKENDS["lxml"] = LxmlStreamingExtractor
+
+if _SelectolaxParser is not None:
+    EXTRACTION_BACKENDS["selectolax"] = extract_text_selectolax
+
+_PREFERENCE = ("selectolax", "lxml", "bs4")
+
+
+def _resolve(name: Optional[str], registry: Dict[str, Callable]) -> str:
+    name = (name or TEXT_EXTRACTOR).lower()
+    if name in registry:
+        return name
+    if name != "auto":
+        print(f"[WARNING] Text extractor '{name}' unavailable; falling back to auto.")
+    return next(b for b in _PREFERENCE if b in registry)
+
+
+def available_backends() -> List[str]:
+    return [b for b in _PREFERENCE if b in EXTRACTION_BACKENDS]
+
+
+def extract_text(html: str, max_chars: int = 2000, backend: Optional[str] = None) -> str:
+    """Visible text of a full HTML document using the configured backend."""
+    return EXTRACTION_BACKENDS[_resolve(backend, EXTRACTION_BACKENDS)](html, max_chars)
+
+
+def new_streaming_extractor(max_chars: int = 2000, backend: Optional[str] = None):
+    """Incremental extractor exposing feed_chunk() / text(); selectolax has no
+    push parser, so it resolves to the next best streaming backend."""
+    return STREAMING_BACKENDS[_resolve(backend, STREAMING_BACKENDS)](max_chars)
@@ -0,0 +1,165 @@
+# ==================================================
+# TRINETRA VERDICT CACHE
+# Content-addressed cache of guard verdicts
+# ==================================================
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import perf_metrics
+import storage
+
+GUARD_CACHE_ENABLED = os.environ.get("GUARD_CACHE_ENABLED", "1") == "1"
+GUARD_CACHE_TTL = int(os.environ.get("GUARD_CACHE_TTL", str(86400)))
+GUARD_CACHE_MAX_ENTRIES = int(os.environ.get("GUARD_CACHE_MAX_ENTRIES", "10000"))
+# Optional second tier in SQLite, shared by workers and kept across restarts
+GUARD_CACHE_PERSIST = os.environ.get("GUARD_CACHE_PERSIST", "1") == "1"
+GUARD_CACHE_DB = os.environ.get("GUARD_CACHE_DB", "trinetra.db")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_input(text: str) -> str:
+    """NFKC + collapsed whitespace: inputs that differ only in invisible
+    formatting share a verdict. Case is kept since it can carry intent."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def verdict_key(text: str, model: str, prompt_version: str) -> str:
+    """Changing the model or the guard prompt invalidates every entry."""
+    material = f"{model}\x00{prompt_version}\x00{normalize_input(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def prompt_version(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+class VerdictCache:
+    """
+    Guard assessments keyed by verdict_key().
+
+    Tier 1 is an in-process LRU (microsecond hits, no I/O); tier 2 is an
+    optional guard_verdicts table in trinetra.db that refills tier 1 on a
+    miss. Both tiers honour GUARD_CACHE_TTL. get_memory() never blocks;
+    get_persistent() and put() touch SQLite, so async callers should run
+    them via asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: Optional[str] = GUARD_CACHE_DB,
+                 max_entries: int = GUARD_CACHE_MAX_ENTRIES, ttl: int = GUARD_CACHE_TTL):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    # ---------- tier 1 ----------
+
+    def get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, assessment = entry
+            if expires_at <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+        perf_metrics.incr("guard_cache.memory_hits")
+        return dict(assessment)
+
+    def _remember(self, key: str, assessment: Dict[str, Any], expires_at: float):
+        with self._lock:
+            self._memory[key] = (expires_at, dict(assessment))
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                perf_metrics.incr("guard_cache.evictions")
+
+    # ---------- tier 2 ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = storage.connect(self.db_path)
+        if not self._schema_ready:
+            with self._lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS guard_verdicts (
+                        verdict_key TEXT PRIMARY KEY,
+                        assessment TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_guard_verdicts_expiry "
+                             "ON guard_verdicts(expires_at)")
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    @property
+    def persistent(self) -> bool:
+        return GUARD_CACHE_PERSIST and bool(self.db_path)
+
+    def get_persistent(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.persistent:
+            perf_metrics.incr("guard_cache.misses")
+            return None
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT assessment, expires_at FROM guard_verdicts
+                WHERE verdict_key = ? AND expires_at > ?
+            ''', (key, time.time())).fetchone()
+
+        if row is None:
+            perf_metrics.incr("guard_cache.misses")
+            return None
+        perf_metrics.incr("guard_cache.persistent_hits")
+        assessment = json.loads(row[0])
+        self._remember(key, assessment, row[1])
+        return assessment
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Blocking two-tier lookup."""
+        return self.get_memory(key) or self.get_persistent(key)
+
+    def put(self, key: str, assessment: Dict[str, Any]):
+        expires_at = time.time() + self.ttl
+        self._remember(key, assessment, expires_at)
+        if not self.persistent:
+            return
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO guard_verdicts (verdict_key, assessment, expires_at)
+                VALUES (?, ?, ?)
+            ''', (key, json.dumps(assessment), expires_at))
+            conn.execute("DELETE FROM guard_verdicts WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        memory_hits = perf_metrics.get_counter("guard_cache.memory_hits")
+        persistent_hits = perf_metrics.get_counter("guard_cache.persistent_hits")
+        misses = perf_metrics.get_counter("guard_cache.misses")
+        lookups = memory_hits + persistent_hits + misses
+        with self._lock:
+            entries = len(self._memory)
+        return {
+            "enabled": GUARD_CACHE_ENABLED,
+            "persistent": self.persistent,
+            "memory_entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "memory_hits": memory_hits,
+            "persistent_hits": persistent_hits,
+            "misses": misses,
+            "evictions": perf_metrics.get_counter("guard_cache.evictions"),
+            "hit_rate": round((memory_hits + persistent_hits) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,72 @@
+# ==================================================
+# TRINETRA VERDICT TOKENS
+# Signed /detect verdicts that /scan can trust
+# ==================================================
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, Any, Optional
+
+import perf_metrics
+
+VERDICT_TOKEN_TTL = int(os.environ.get("VERDICT_TOKEN_TTL", "300"))
+# Set explicitly when running several workers, so tokens verify on any of them
+VERDICT_TOKEN_SECRET = os.environ.get("VERDICT_TOKEN_SECRET", "").encode("utf-8")
+if not VERDICT_TOKEN_SECRET:
+    print("[WARNING] VERDICT_TOKEN_SECRET not set; verdict tokens are valid only in this process.")
+    VERDICT_TOKEN_SECRET = os.urandom(32)
+
+# Decision fields carried in the token (everything /scan reads)
+TOKEN_FIELDS = ("decision", "status", "risk_level", "reason", "threat_score", "matched_patterns")
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _sign(body: str) -> str:
+    return _b64(hmac.new(VERDICT_TOKEN_SECRET, body.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_verdict_token(text: str, decision: Dict[str, Any]) -> str:
+    """<payload>.<signature>, binding the decision to the exact text."""
+    payload = {
+        "h": _text_hash(text),
+        "exp": int(time.time()) + VERDICT_TOKEN_TTL,
+        "d": {k: decision[k] for k in TOKEN_FIELDS if k in decision},
+    }
+    body = _b64(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    perf_metrics.incr("verdict_token.issued")
+    return f"{body}.{_sign(body)}"
+
+
+def verify_verdict_token(token: str, text: str) -> Optional[Dict[str, Any]]:
+    """The signed decision if the token is authentic, unexpired and was
+    issued for exactly this text; None means the text must be re-scored."""
+    try:
+        body, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(body)):
+            raise ValueError("bad signature")
+        payload = json.loads(_unb64(body))
+        if payload["exp"] < time.time():
+            raise ValueError("expired")
+        if not hmac.compare_digest(payload["h"], _text_hash(text)):
+            raise ValueError("text mismatch")
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        perf_metrics.incr("verdict_token.rejected")
+        return None
+
+    perf_metrics.incr("verdict_token.accepted")
+    return payload["d"]